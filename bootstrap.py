@@ -1,31 +1,86 @@
 #!/usr/bin/env python3
 """
 Bootstrap script for RooCode project template initialization and migration.
-Supports --init (new project setup), --migrate (existing project migration), and --update (safe template updates) modes.
+Supports --init (new project setup), --migrate (existing project migration), --update (safe template updates)
+and --rollback (undo the last update) modes.
 """
 
 import subprocess
 import sys
 import shutil
-import tempfile
 import argparse
 import os
 import hashlib
+import io
 import json
+import posixpath
+import re
+import stat
+import tarfile
+import zipfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from functools import partial
 from pathlib import Path
+from urllib.parse import quote, unquote
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple, Optional, Union
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# Template files by manifest key: (source file, or its content when read from an archive; hash)
+TemplateFiles = Dict[str, Tuple[Union[Path, bytes], str]]
 
 # --- CONFIGURATION ---
 TEMPLATE_DIRS_TO_COPY = [".roo", "scripts", "pages", "docs", "journals"]
 MIGRATION_SOURCE_DIRS = ["docs/memory-bank", "docs/memory-bank/user_story"]
+# Directories of .roo/ linked into pages/, by link name prefix
+SYMLINK_SOURCE_DIRS = {"rules": ".roo/rules", "commands": ".roo/commands"}
+# Where links to migrated documents are rewritten (.roo holds template files, which stay untouched)
+LINK_REWRITE_DIRS = ["pages", "journals", "docs"]
+WIKI_LINK_PATTERN = re.compile(r'\[\[([^\[\]|]+)(\|[^\[\]]*)?\]\]')
+MARKDOWN_LINK_PATTERN = re.compile(r'(!?\[[^\]]*\]\()([^)\s]+)((?:\s+"[^"]*")?\))')
+LINK_SCHEME_PATTERN = re.compile(r'^[A-Za-z][A-Za-z0-9+.-]*:')
+
+# Template hash manifest, relative to the project root
+MANIFEST_PATH = Path(".roo") / ".template_hashes.json"
+MANIFEST_VERSION = 2
+# Pages copied instead of linked where symlinks are unavailable, with the hash of each copy
+LINK_COPIES_PATH = Path(".roo") / ".page_link_copies.json"
+# Staging area, journal and backups of the last update, relative to the project root
+TRANSACTION_DIR = Path(".roo") / ".bootstrap"
+# Read size used when hashing files
+HASH_CHUNK_SIZE = 1024 * 1024
+# Persistent clones of template repositories, one per repository URL
+TEMPLATE_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "roo-project-template"
+# How --link-mode places template files in projects
+LINK_MODES = ["copy", "reflink", "hardlink"]
+# Template files that --link-mode hardlink may share with the template. Linked files are made
+# read-only, and files the project has customized are always cloned or copied instead
+HARDLINK_DIRS = [".roo/rules"]
+# Linux ioctl that clones a whole file copy-on-write (btrfs, XFS, bcachefs, ...)
+FICLONE = 0x40049409
+# Throughput and per-file cost assumed by --plan to estimate how long a run takes
+PLAN_HASH_BYTES_PER_SECOND = 400 * 1024 * 1024
+PLAN_COPY_BYTES_PER_SECOND = 150 * 1024 * 1024
+PLAN_SECONDS_PER_FILE = 0.0005
+# Threads used to hash and copy template files; the work is I/O bound
+MAX_IO_WORKERS = min(32, (os.cpu_count() or 1) + 4)
 
 
 def run_command(command, cwd):
-    """Run a shell command and return success status."""
+    """Run a command (a list of arguments, no shell) and return success status."""
     print(f"\n> Running command: {' '.join(command)}")
-    result = subprocess.run(command, cwd=cwd, capture_output=True, text=True, shell=True)
+    try:
+        result = subprocess.run(command, cwd=cwd, capture_output=True, text=True)
+    except FileNotFoundError:
+        print(f"❌ Command not found: {command[0]}")
+        return False
     if result.returncode != 0:
         print(f"❌ Command failed:\n{result.stderr or result.stdout}")
         return False
@@ -34,12 +89,54 @@ def run_command(command, cwd):
     return True
 
 
+def template_cache_path(repo: str, cache_dir: Path) -> Path:
+    """Return the cache directory of a template repository URL."""
+    name = re.sub(r'[^A-Za-z0-9._-]', '-', repo.rstrip('/').rsplit('/', 1)[-1])
+    if name.endswith('.git'):
+        name = name[:-len('.git')]
+    return cache_dir / f"{name}-{hashlib.sha256(repo.encode('utf-8')).hexdigest()[:12]}"
+
+
+def fetch_template(repo: str, cache_dir: Path = TEMPLATE_CACHE_DIR) -> Optional[Path]:
+    """
+    Return a checkout of the template repository from the local cache.
+
+    The first run makes a shallow, blobless clone whose working tree is
+    sparse-checked-out to TEMPLATE_DIRS_TO_COPY; later runs only fetch the
+    latest commit into it. If the fetch fails but a cached checkout exists,
+    that checkout is used so the script keeps working offline.
+    """
+    checkout = template_cache_path(repo, cache_dir)
+    if (checkout / ".git").is_dir():
+        print(f"Updating cached template from {repo}...")
+        if (run_command(["git", "fetch", "--depth", "1", "--filter=blob:none", "origin", "HEAD"], cwd=checkout)
+                and run_command(["git", "reset", "--hard", "FETCH_HEAD"], cwd=checkout)):
+            return checkout
+        print(f"⚠️  Warning: Could not update the template cache, using the cached copy in {checkout}")
+        return checkout
+
+    print(f"Cloning template from {repo} into {checkout}...")
+    checkout.parent.mkdir(parents=True, exist_ok=True)
+    if checkout.exists():
+        shutil.rmtree(checkout)  # Left over from an interrupted clone
+    if not run_command(["git", "clone", "--depth", "1", "--filter=blob:none", "--no-checkout",
+                        repo, str(checkout)], cwd=checkout.parent):
+        shutil.rmtree(checkout, ignore_errors=True)
+        return None
+    # Sparse checkout needs Git 2.25+; older versions simply check out everything
+    run_command(["git", "sparse-checkout", "set"] + TEMPLATE_DIRS_TO_COPY, cwd=checkout)
+    if not run_command(["git", "checkout", "--force"], cwd=checkout):
+        shutil.rmtree(checkout, ignore_errors=True)
+        return None
+    return checkout
+
+
 def calculate_file_hash(file_path: Path) -> str:
     """Calculate SHA256 hash of a file."""
     hash_sha256 = hashlib.sha256()
     try:
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
                 hash_sha256.update(chunk)
         return hash_sha256.hexdigest()
     except Exception as e:
@@ -47,166 +144,694 @@ def calculate_file_hash(file_path: Path) -> str:
         return ""
 
 
-def is_file_modified(file_path: Path, original_hash: str) -> bool:
-    """Check if a file has been modified by comparing its current hash with the original."""
-    if not original_hash:
+def materialize_bytes(path: Path, data: bytes) -> bool:
+    """
+    Make the file at `path` contain exactly `data`, writing it only when its current
+    content differs, so that unchanged runs do not make Logseq re-index the file.
+    Returns True if the file was written.
+    """
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(str(temp_path), str(path))
+    return True
+
+
+def manifest_key(relative_path: Path) -> str:
+    """Return the manifest key of a project-relative path: POSIX separators on every platform."""
+    return relative_path.as_posix()
+
+
+def load_manifest(hashes_file: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the template hash manifest as {posix path: {"hash", "size", "mtime_ns"}}.
+
+    Version 1 manifests were a flat {path: hash} map, keyed with the separators
+    of the platform that wrote them; their keys are normalized and their entries
+    carry no stat data, so those files are hashed once and then recorded in v2.
+    """
+    if not hashes_file.exists():
+        return {}
+    try:
+        with open(hashes_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"⚠️  Warning: Could not load template hashes: {e}")
+        return {}
+
+    if isinstance(data, dict) and data.get("version") == MANIFEST_VERSION:
+        return {key.replace("\\", "/"): entry for key, entry in data.get("files", {}).items()}
+    return {key.replace("\\", "/"): {"hash": value} for key, value in data.items() if isinstance(value, str)}
+
+
+def save_manifest(hashes_file: Path, manifest: Dict[str, Dict[str, Any]]) -> bool:
+    """Write the v2 manifest, skipping the write if nothing changed."""
+    data = {"version": MANIFEST_VERSION, "files": dict(sorted(manifest.items()))}
+    return materialize_bytes(hashes_file, json.dumps(data, indent=2).encode('utf-8'))
+
+
+def manifest_entry(file_hash: str, file_path: Path) -> Dict[str, Any]:
+    """Build a manifest entry recording the hash and the current stat of a file with that content."""
+    stat = file_path.stat()
+    return {"hash": file_hash, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def stat_matches_entry(file_path: Path, entry: Optional[Dict[str, Any]]) -> bool:
+    """Whether a file still has the size and modification time recorded in its manifest entry."""
+    if not entry or "size" not in entry or "mtime_ns" not in entry:
         return False
-    current_hash = calculate_file_hash(file_path)
-    return current_hash != original_hash
+    stat = file_path.stat()
+    return stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]
 
 
-def copy_template_files(template_path: Path, project_path: Path):
-    """Copy template directories to project."""
+def current_file_hash(file_path: Path, entry: Optional[Dict[str, Any]]) -> str:
+    """
+    Return the hash of a file, trusting the manifest instead of reading the file
+    when its size and modification time still match the recorded ones.
+    """
+    if stat_matches_entry(file_path, entry):
+        return entry["hash"]
+    return calculate_file_hash(file_path)
+
+
+def reflink_file(source_file: Path, target_file: Path) -> bool:
+    """
+    Clone a file copy-on-write, so that no data is copied until either side
+    changes. Returns False if the platform or filesystem cannot do it.
+    """
+    if fcntl is None:
+        return False
+    try:
+        with open(source_file, 'rb') as src, open(target_file, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    except OSError:
+        if target_file.exists():
+            target_file.unlink()
+        return False
+    shutil.copystat(source_file, target_file)
+    return True
+
+
+def place_template_file(source_file: Union[Path, bytes], target_file: Path, key: str,
+                        link_mode: str = "copy", shareable: bool = True) -> str:
+    """
+    Create `target_file` with the content of a template file, as cheaply as
+    `link_mode` allows: a hardlink, then a copy-on-write clone, then a plain
+    copy. Content read from a template archive is simply written. Returns the
+    method that was used.
+
+    Only files under HARDLINK_DIRS that the project has not customized
+    (`shareable`) are hard-linked, and the shared inode is made read-only so
+    that an in-place edit fails instead of changing the template and every
+    other project linked to it. Copies and clones are always left writable.
+    """
+    if isinstance(source_file, bytes):
+        target_file.write_bytes(source_file)
+        return "copy"
+    if (link_mode == "hardlink" and shareable
+            and any(key.startswith(directory + "/") for directory in HARDLINK_DIRS)):
+        try:
+            os.link(str(source_file), str(target_file))
+            mode = stat.S_IMODE(target_file.stat().st_mode)
+            os.chmod(str(target_file), mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+            return "hardlink"
+        except OSError:
+            pass  # Different filesystem, or links not supported
+    if link_mode in ("reflink", "hardlink") and reflink_file(source_file, target_file):
+        method = "reflink"
+    else:
+        shutil.copy2(source_file, target_file)
+        method = "copy"
+    # The template file may be read-only because another project hard-linked it
+    mode = stat.S_IMODE(target_file.stat().st_mode)
+    if not mode & stat.S_IWUSR:
+        os.chmod(str(target_file), mode | stat.S_IWUSR)
+    return method
+
+
+def copy_template_files(template_path: Path, project_path: Path, delete: bool = False,
+                        workers: int = MAX_IO_WORKERS, link_mode: str = "copy",
+                        template_files: Optional[TemplateFiles] = None) -> Dict[str, int]:
+    """
+    Sync template directories into the project, like rsync: only files whose
+    content differs from the template are copied, and files that are not part
+    of the template (user pages, for example) are left alone. With `delete`,
+    files installed from an earlier template version that the template no
+    longer has are removed, unless the user modified them.
+    """
     print("\n--- Stage 1: Copying/Updating template files ---")
+    stats = sync_template_files(template_path, project_path, overwrite_modified=True,
+                                delete=delete, workers=workers, template_files=template_files,
+                                link_mode=link_mode)
+    print(f"✅ Template synced: {stats['added']} added, {stats['updated']} updated, "
+          f"{stats['unchanged']} unchanged, {stats['deleted']} deleted.")
+    if stats['skipped'] > 0:
+        print(f"⏭️  Kept {stats['skipped']} user-modified files that the template no longer has.")
+    if stats['errors'] > 0:
+        print(f"❌ Errors: {stats['errors']}")
+    return stats
+
+
+class FileAction:
+    """A template file and the action the update plans for it."""
+
+    __slots__ = ("key", "source", "target", "entry", "template_hash", "action", "customized")
+
+    def __init__(self, key: str, source: Optional[Union[Path, bytes]], target: Path,
+                 entry: Optional[Dict[str, Any]]):
+        self.key = key
+        # None for a file installed earlier that the template no longer has
+        self.source = source
+        self.target = target
+        # Manifest entry of the target from the previous run, if any
+        self.entry = entry
+        self.template_hash = ""
+        # One of 'add', 'update', 'unchanged', 'skip', 'delete', 'keep' or 'error'
+        self.action = ""
+        # The project file differs from the template version installed last time
+        self.customized = False
+
+
+# Statistics counter incremented by each planned action once it has been carried out
+ACTION_STATS = {
+    'add': 'added',
+    'update': 'updated',
+    'unchanged': 'unchanged',
+    'skip': 'skipped',
+    'delete': 'deleted',
+    'error': 'errors',
+}
+
+
+def is_project_state_key(key: str) -> bool:
+    """Whether a path holds this script's own bookkeeping, which is never copied from a template."""
+    return (key in (manifest_key(MANIFEST_PATH), manifest_key(LINK_COPIES_PATH))
+            or key.startswith(manifest_key(TRANSACTION_DIR) + "/"))
+
+
+def iter_template_files(template_path: Path) -> Iterator[Tuple[str, Path]]:
+    """Yield (manifest key, source path) for every file of the template directories."""
     for dir_name in TEMPLATE_DIRS_TO_COPY:
         source_dir = template_path / dir_name
-        target_dir = project_path / dir_name
-        
         if not source_dir.is_dir():
             print(f"⚠️  Warning: Template directory '{dir_name}' not found.")
             continue
-            
-        if target_dir.exists():
-            print(f"Updating directory '{dir_name}'...")
-            shutil.rmtree(target_dir)
-        
+        for root, _, files in os.walk(source_dir):
+            for name in files:
+                source_file = Path(root) / name
+                key = manifest_key(source_file.relative_to(template_path))
+                if not is_project_state_key(key):
+                    yield key, source_file
+
+
+def index_template_files(template_path: Path,
+                         workers: int = MAX_IO_WORKERS) -> TemplateFiles:
+    """
+    Hash every template file once, as {manifest key: (source path, hash)}, so
+    that the same template can be planned against many projects.
+    """
+    files = list(iter_template_files(template_path))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        hashes = list(pool.map(calculate_file_hash, [source_file for _, source_file in files]))
+    return {key: (source_file, file_hash) for (key, source_file), file_hash in zip(files, hashes)}
+
+
+def archive_member_parts(name: str) -> Optional[List[str]]:
+    """Split an archive member name into path parts, or None if the name is unsafe."""
+    parts = [part for part in name.replace("\\", "/").split("/") if part not in ("", ".")]
+    if not parts or name.startswith("/") or ".." in parts:
+        return None
+    return parts
+
+
+def archive_wrapper_dir(member_parts: Iterable[List[str]]) -> Optional[str]:
+    """
+    Return the top-level directory that wraps the whole archive, such as
+    GitHub's `repo-main/`, or None. An archive is wrapped only if every member
+    lies in the same directory and that directory is not a template directory.
+    """
+    tops = set()
+    for parts in member_parts:
+        tops.add(parts[0])
+        if len(tops) > 1:
+            return None
+    if len(tops) != 1:
+        return None
+    top = tops.pop()
+    return None if top in TEMPLATE_DIRS_TO_COPY else top
+
+
+def archive_member_key(parts: List[str], wrapper: Optional[str]) -> Optional[str]:
+    """
+    Return the manifest key of an archive member inside TEMPLATE_DIRS_TO_COPY,
+    or None. `wrapper` is the archive's top-level directory, stripped from
+    every member, as found by archive_wrapper_dir.
+    """
+    if wrapper is not None:
+        parts = parts[1:]
+    if len(parts) < 2 or parts[0] not in TEMPLATE_DIRS_TO_COPY:
+        return None
+    key = "/".join(parts)
+    if is_project_state_key(key):
+        return None
+    return key
+
+
+def read_archive_member(stream) -> Tuple[bytes, str]:
+    """Read an archive member stream, hashing it on the way. Returns (content, hash)."""
+    hash_sha256 = hashlib.sha256()
+    chunks = []
+    for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b""):
+        hash_sha256.update(chunk)
+        chunks.append(chunk)
+    return b"".join(chunks), hash_sha256.hexdigest()
+
+
+def index_template_archive(archive_path: Path) -> TemplateFiles:
+    """
+    Read the template files straight out of a .tar.gz (or any tar) or .zip
+    archive, without extracting a checkout. Tar archives are read as a single
+    stream; only regular files in TEMPLATE_DIRS_TO_COPY are read and hashed.
+    """
+    template_files: TemplateFiles = {}
+    if zipfile.is_zipfile(str(archive_path)):
+        with zipfile.ZipFile(str(archive_path)) as archive:
+            members = [(info, archive_member_parts(info.filename)) for info in archive.infolist()]
+            wrapper = archive_wrapper_dir(parts for _, parts in members if parts is not None)
+            for info, parts in members:
+                key = archive_member_key(parts, wrapper) if parts is not None else None
+                if key is None or info.is_dir():
+                    continue
+                with archive.open(info) as stream:
+                    template_files[key] = read_archive_member(stream)
+        return template_files
+
+    # The wrapper directory is only known at the end of the stream, so members
+    # that would be template files with or without it are read on the way
+    member_parts: List[List[str]] = []
+    candidates: List[Tuple[List[str], Tuple[bytes, str]]] = []
+    with tarfile.open(str(archive_path), mode="r|*") as archive:
+        for member in archive:
+            parts = archive_member_parts(member.name)
+            if parts is None:
+                continue
+            member_parts.append(parts)
+            if not member.isfile():
+                continue
+            if archive_member_key(parts, None) is None and archive_member_key(parts, parts[0]) is None:
+                continue
+            stream = archive.extractfile(member)
+            if stream is not None:
+                candidates.append((parts, read_archive_member(stream)))
+    wrapper = archive_wrapper_dir(member_parts)
+    for parts, content in candidates:
+        key = archive_member_key(parts, wrapper)
+        if key is not None:
+            template_files[key] = content
+    return template_files
+
+
+def plan_file_action(item: FileAction, overwrite_modified: bool = False,
+                     delete: bool = False) -> FileAction:
+    """
+    Hash the template file and the project file and decide what to do with the
+    latter. Files modified by the user are skipped unless `overwrite_modified`.
+    """
+    try:
+        if item.source is None:
+            # Template-owned files are only deleted on request and if the user never touched them
+            if not delete:
+                item.action = 'keep'
+            elif current_file_hash(item.target, item.entry) == item.entry["hash"]:
+                item.action = 'delete'
+            else:
+                item.action = 'skip'
+            return item
+        if not item.template_hash:
+            item.template_hash = calculate_file_hash(item.source)
+        if not item.template_hash:
+            item.action = 'error'
+        elif not item.target.exists():
+            item.action = 'add'
+        else:
+            current_hash = current_file_hash(item.target, item.entry)
+            if current_hash == item.template_hash:
+                item.action = 'unchanged'  # Already identical to the template
+            else:
+                item.customized = not item.entry or current_hash != item.entry["hash"]
+                if not overwrite_modified and item.entry and item.customized:
+                    item.action = 'skip'  # Modified by the user since the template version we installed
+                else:
+                    item.action = 'update'
+    except Exception as e:
+        print(f"❌ Error checking file {item.target}: {e}")
+        item.action = 'error'
+    return item
+
+
+def plan_template_update(template_path: Path, project_path: Path,
+                         manifest: Dict[str, Dict[str, Any]],
+                         workers: int = MAX_IO_WORKERS, overwrite_modified: bool = False,
+                         delete: bool = False,
+                         template_files: Optional[TemplateFiles] = None) -> List[FileAction]:
+    """
+    Plan the update of every template file in one pass: both trees are hashed
+    on a thread pool and each file gets its action. Files recorded in the
+    manifest that the template no longer has are planned too. Nothing is written.
+    `template_files` is an index_template_files() result to reuse template hashes.
+    """
+    if template_files is None:
+        items = [
+            FileAction(key, source_file, project_path / key, manifest.get(key))
+            for key, source_file in iter_template_files(template_path)
+        ]
+    else:
+        items = []
+        for key, (source_file, template_hash) in template_files.items():
+            item = FileAction(key, source_file, project_path / key, manifest.get(key))
+            item.template_hash = template_hash
+            items.append(item)
+    template_keys = {item.key for item in items}
+    items.extend(
+        FileAction(key, None, project_path / key, entry)
+        for key, entry in sorted(manifest.items())
+        if key not in template_keys and (project_path / key).is_file()
+    )
+    plan_one = partial(plan_file_action, overwrite_modified=overwrite_modified, delete=delete)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(plan_one, items))
+
+
+def prune_empty_dirs(directory: Path, project_path: Path) -> None:
+    """Remove `directory` and its parents while they are empty, keeping the template directories themselves."""
+    while len(directory.relative_to(project_path).parts) > 1:
+        try:
+            directory.rmdir()
+        except OSError:
+            break  # Not empty
+        directory = directory.parent
+
+
+class UpdateTransaction:
+    """
+    Applies the file changes of one template sync as a transaction.
+
+    New content is first copied into a staging directory. The journal, which
+    lists every file about to change, is then written, and the changes are
+    committed with atomic renames: the old version of each file is moved into
+    the backup directory and the staged version is moved into place. The
+    manifest is written last. A transaction interrupted half way is rolled
+    back on the next run, and the last committed one can be undone with
+    `bootstrap.py --rollback`. Only journaled files are touched by a rollback.
+    """
+
+    def __init__(self, project_path: Path, link_mode: str = "copy"):
+        self.project_path = project_path
+        self.link_mode = link_mode
+        # How each staged file was placed, see place_template_file()
+        self.placements: List[str] = []
+        self.root = project_path / TRANSACTION_DIR
+        self.staging_dir = self.root / "staging"
+        self.backup_dir = self.root / "backup"
+        self.journal_path = self.root / "journal.json"
+
+    def load_journal(self) -> Optional[Dict[str, Any]]:
+        """Return the journal of the last transaction, if there is one."""
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def write_journal(self, journal: Dict[str, Any]) -> None:
+        materialize_bytes(self.journal_path, json.dumps(journal, indent=2).encode('utf-8'))
+
+    def begin(self) -> None:
+        """Start a new transaction, discarding the backups of the previous one."""
+        if self.root.exists():
+            shutil.rmtree(self.root)
+        self.staging_dir.mkdir(parents=True)
+        # Keep the transaction data out of the project's Git repository
+        (self.root / ".gitignore").write_text("*\n", encoding='utf-8')
+
+    def stage(self, item: FileAction) -> Optional[Path]:
+        """Place the template version of a file into the staging directory."""
+        staged_file = self.staging_dir / item.key
         try:
-            shutil.copytree(source_dir, target_dir)
-            print(f"✅ Directory '{dir_name}' copied successfully.")
+            staged_file.parent.mkdir(parents=True, exist_ok=True)
+            self.placements.append(place_template_file(item.source, staged_file, item.key, self.link_mode,
+                                                       shareable=not item.customized))
+            return staged_file
         except Exception as e:
-            print(f"❌ Error copying '{dir_name}': {e}")
+            print(f"❌ Error staging file {item.source}: {e}")
+            return None
+
+    def commit(self, plan: List[FileAction], hashes_file: Path,
+               manifest: Dict[str, Dict[str, Any]]) -> None:
+        """Move the staged files into place, then write the manifest."""
+        entries = [
+            {"key": item.key, "action": item.action, "hash": item.template_hash}
+            for item in plan if item.action in ('add', 'update', 'delete')
+        ]
+        manifest_backup = self.backup_dir / manifest_key(MANIFEST_PATH)
+        manifest_backup.parent.mkdir(parents=True, exist_ok=True)
+        had_manifest = hashes_file.exists()
+        if had_manifest:
+            shutil.copy2(hashes_file, manifest_backup)
+        journal = {
+            "status": "pending",
+            "started": datetime.now().isoformat(timespec='seconds'),
+            "had_manifest": had_manifest,
+            "entries": entries,
+        }
+        self.write_journal(journal)
+
+        for entry in entries:
+            target_file = self.project_path / entry["key"]
+            if entry["action"] in ('update', 'delete'):
+                backup_file = self.backup_dir / entry["key"]
+                backup_file.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(str(target_file), str(backup_file))
+            if entry["action"] == 'delete':
+                prune_empty_dirs(target_file.parent, self.project_path)
+            else:
+                target_file.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(str(self.staging_dir / entry["key"]), str(target_file))
+        save_manifest(hashes_file, manifest)
+
+        journal["status"] = "committed"
+        self.write_journal(journal)
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
 
+    def rollback(self) -> Dict[str, int]:
+        """
+        Restore the files changed by the last transaction from the journal.
+        Files modified since that transaction are left alone and reported.
+        """
+        stats = {'restored': 0, 'removed': 0, 'kept': 0}
+        journal = self.load_journal()
+        if journal is None:
+            return stats
+        for entry in reversed(journal["entries"]):
+            target_file = self.project_path / entry["key"]
+            backup_file = self.backup_dir / entry["key"]
+            if entry["action"] != 'add' and not backup_file.exists():
+                continue  # The commit stopped before this file was touched
+            if target_file.exists():
+                if entry["action"] == 'delete' or calculate_file_hash(target_file) != entry["hash"]:
+                    print(f"  ⏭️  Kept file modified after the update: {entry['key']}")
+                    stats['kept'] += 1
+                    continue
+                if entry["action"] == 'add':
+                    target_file.unlink()
+                    prune_empty_dirs(target_file.parent, self.project_path)
+                    print(f"  🗑️  Removed added file: {entry['key']}")
+                    stats['removed'] += 1
+                    continue
+            if backup_file.exists():
+                target_file.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(str(backup_file), str(target_file))
+                print(f"  ↩️  Restored file: {entry['key']}")
+                stats['restored'] += 1
 
-def copy_file_safely(source_file: Path, target_file: Path, file_hashes: Dict[str, str]) -> str:
+        hashes_file = self.project_path / MANIFEST_PATH
+        if journal.get("had_manifest"):
+            shutil.copy2(self.backup_dir / manifest_key(MANIFEST_PATH), hashes_file)
+        elif hashes_file.exists():
+            hashes_file.unlink()
+        shutil.rmtree(self.root)
+        return stats
+
+    def recover(self) -> None:
+        """Roll back a transaction that was interrupted before it committed."""
+        journal = self.load_journal()
+        if journal is not None and journal.get("status") != "committed":
+            print("⚠️  Found an interrupted update, rolling it back first...")
+            self.rollback()
+        elif journal is None and self.root.exists():
+            shutil.rmtree(self.root)  # Interrupted while staging; nothing was changed yet
+
+
+def apply_file_action(item: FileAction, transaction: UpdateTransaction) -> Optional[Dict[str, Any]]:
     """
-    Copy a file safely, preserving user modifications.
-    Returns status: 'added', 'updated', 'skipped', or 'error'
+    Stage a planned action and return the new manifest entry of the file, if
+    any. Deleted files get no entry; the deletion itself happens on commit.
     """
+    if item.source is None:
+        return None if item.action == 'delete' else item.entry
+    if item.action in ('add', 'update'):
+        staged_file = transaction.stage(item)
+        if staged_file is None:
+            item.action = 'error'
+            return item.entry
+        # Renaming keeps the staged file's stat, so the entry stays valid once it is moved into place
+        return manifest_entry(item.template_hash, staged_file)
     try:
-        # Create parent directories if they don't exist
-        target_file.parent.mkdir(parents=True, exist_ok=True)
-        
-        # If target file doesn't exist, simply copy it
-        if not target_file.exists():
-            shutil.copy2(source_file, target_file)
-            return 'added'
-        
-        # Get relative path for hash lookup
-        relative_path = str(source_file.relative_to(source_file.parent.parent))
-        
-        # Check if we have hash information for this file
-        if relative_path in file_hashes:
-            original_hash = file_hashes[relative_path]
-            # Check if user has modified the file
-            if is_file_modified(target_file, original_hash):
-                return 'skipped'  # Skip to preserve user changes
-        
-        # Create backup before overwriting
-        backup_path = target_file.with_suffix(target_file.suffix + '.backup')
-        shutil.copy2(target_file, backup_path)
-        
-        # Copy new file
-        shutil.copy2(source_file, target_file)
-        
-        # Remove backup if copy was successful
-        if backup_path.exists():
-            backup_path.unlink()
-        
-        return 'updated'
-    except Exception as e:
-        print(f"❌ Error copying file {source_file} to {target_file}: {e}")
-        return 'error'
+        if item.action == 'unchanged':
+            return manifest_entry(item.template_hash, item.target)
+    except OSError as e:
+        print(f"⚠️  Warning: Could not stat {item.target}: {e}")
+    if item.action == 'skip':
+        return {"hash": item.template_hash}
+    return item.entry
 
 
-def update_template_files(template_path: Path, project_path: Path) -> Dict[str, int]:
+def execute_template_update(plan: List[FileAction], project_path: Path, hashes_file: Path,
+                            workers: int = MAX_IO_WORKERS, link_mode: str = "copy") -> List[str]:
     """
-    Update template files in an existing project safely.
-    Only adds missing files or updates unmodified files.
-    Returns a dictionary with statistics about the update operation.
+    Stage the planned copies on a thread pool, then commit all changes and the
+    new manifest as one transaction. A failed commit is rolled back and re-raised.
+    Returns how each file was placed.
+    """
+    transaction = UpdateTransaction(project_path, link_mode)
+    has_changes = any(item.action in ('add', 'update', 'delete') for item in plan)
+    if has_changes:
+        transaction.begin()
+    new_manifest: Dict[str, Dict[str, Any]] = {}
+    apply_one = partial(apply_file_action, transaction=transaction)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for item, entry in zip(plan, pool.map(apply_one, plan)):
+            if entry:
+                new_manifest[item.key] = entry
+    if not has_changes:
+        # Nothing to commit; the last transaction stays available for --rollback
+        save_manifest(hashes_file, new_manifest)
+        return []
+    try:
+        transaction.commit(plan, hashes_file, new_manifest)
+    except BaseException:
+        print("❌ Update failed while committing, rolling back...")
+        transaction.rollback()
+        raise
+    return transaction.placements
+
+
+def rollback_project(project_root: Path) -> bool:
+    """Undo the last template update of a project. This is the --rollback mode implementation."""
+    print("\n--- ↩️  Rolling back the last template update ---")
+    transaction = UpdateTransaction(project_root)
+    journal = transaction.load_journal()
+    if journal is None:
+        print("ℹ️  No update to roll back.")
+        return False
+    print(f"Update started at {journal.get('started')}, {len(journal['entries'])} files changed.")
+    stats = transaction.rollback()
+    print("\n📊 Rollback Summary:")
+    print(f"   ↩️  Restored files: {stats['restored']}")
+    print(f"   🗑️  Removed added files: {stats['removed']}")
+    if stats['kept'] > 0:
+        print(f"   ⏭️  Kept files modified after the update: {stats['kept']}")
+    # Drop the pages/ links (and tracked page copies) of rules and commands the rollback removed
+    create_symlinks_in_pages(project_root)
+    print("\n✅ Rollback completed.")
+    return True
+
+
+def sync_template_files(template_path: Path, project_path: Path, overwrite_modified: bool,
+                        delete: bool = False, workers: int = MAX_IO_WORKERS,
+                        template_files: Optional[TemplateFiles] = None,
+                        link_mode: str = "copy") -> Dict[str, int]:
+    """
+    Bring the template files of a project in line with the template, doing I/O
+    only for files that differ, and record the result in the manifest.
+    Returns a dictionary with statistics about the operation.
     """
-    print("\n--- Stage 1: Updating template files safely ---")
-    
     # Statistics tracking
     stats = {
         'added': 0,
         'updated': 0,
+        'unchanged': 0,
         'skipped': 0,
+        'deleted': 0,
         'errors': 0
     }
     
-    # Try to load file hashes from previous run (if available)
-    hashes_file = project_path / '.roo' / '.template_hashes.json'
-    file_hashes = {}
-    if hashes_file.exists():
-        try:
-            with open(hashes_file, 'r') as f:
-                file_hashes = json.load(f)
-        except Exception as e:
-            print(f"⚠️  Warning: Could not load template hashes: {e}")
+    UpdateTransaction(project_path).recover()
     
-    # Process each template directory
-    for dir_name in TEMPLATE_DIRS_TO_COPY:
-        source_dir = template_path / dir_name
-        target_dir = project_path / dir_name
-        
-        if not source_dir.is_dir():
-            print(f"⚠️  Warning: Template directory '{dir_name}' not found.")
-            continue
-        
-        print(f"\n📁 Processing directory: {dir_name}")
-        
-        # Walk through all files in the source directory
-        for source_file in source_dir.rglob('*'):
-            if source_file.is_file():
-                # Calculate the relative path from the source directory
-                relative_path = source_file.relative_to(source_dir)
-                target_file = target_dir / relative_path
-                
-                # Copy file safely
-                status = copy_file_safely(source_file, target_file, file_hashes)
-                
-                # Update statistics
-                if status == 'added':
-                    print(f"  ✅ Added new file: {relative_path}")
-                    stats['added'] += 1
-                elif status == 'updated':
-                    print(f"  🔄 Updated file: {relative_path}")
-                    stats['updated'] += 1
-                elif status == 'skipped':
-                    print(f"  ⏭️  Skipped modified file: {relative_path}")
-                    stats['skipped'] += 1
-                elif status == 'error':
-                    stats['errors'] += 1
+    # Load the manifest from the previous run (if available)
+    hashes_file = project_path / MANIFEST_PATH
+    manifest = load_manifest(hashes_file)
     
-    # Create/update hash file with current template file hashes
-    try:
-        new_hashes = {}
-        for dir_name in TEMPLATE_DIRS_TO_COPY:
-            source_dir = template_path / dir_name
-            if source_dir.is_dir():
-                for file_path in source_dir.rglob('*'):
-                    if file_path.is_file():
-                        relative_path = str(file_path.relative_to(template_path))
-                        new_hashes[relative_path] = calculate_file_hash(file_path)
-        
-        # Save hashes for future updates
-        hashes_dir = project_path / '.roo'
-        hashes_dir.mkdir(exist_ok=True)
-        with open(hashes_file, 'w') as f:
-            json.dump(new_hashes, f, indent=2)
-    except Exception as e:
-        print(f"⚠️  Warning: Could not save template hashes: {e}")
+    started = time.monotonic()
+    plan = plan_template_update(template_path, project_path, manifest, workers,
+                                overwrite_modified=overwrite_modified, delete=delete,
+                                template_files=template_files)
+    planned = time.monotonic()
+    placements = execute_template_update(plan, project_path, hashes_file, workers, link_mode)
+    finished = time.monotonic()
+    
+    for item in sorted(plan, key=lambda planned_item: planned_item.key):
+        if item.action == 'add':
+            print(f"  ✅ Added new file: {item.key}")
+        elif item.action == 'update':
+            print(f"  🔄 Updated file: {item.key}")
+        elif item.action == 'skip':
+            print(f"  ⏭️  Skipped modified file: {item.key}")
+        elif item.action == 'delete':
+            print(f"  🗑️  Deleted file removed from template: {item.key}")
+        if item.action in ACTION_STATS:
+            stats[ACTION_STATS[item.action]] += 1
+    
+    print(f"\nℹ️  Checked {len(plan)} files in {planned - started:.2f}s, "
+          f"synced in {finished - planned:.2f}s ({workers} workers)")
+    if link_mode != "copy" and placements:
+        print(f"ℹ️  Placed {len(placements)} files: {placements.count('hardlink')} hardlinked, "
+              f"{placements.count('reflink')} reflinked, {placements.count('copy')} copied")
     
     return stats
 
 
-def migrate_existing_docs(project_path: Path):
-    """Migrate existing documentation to pages/ directory."""
-    print("\n--- Stage 2: Migrating existing documentation to pages/ ---")
-    target_pages_dir = project_path / "pages"
-    target_pages_dir.mkdir(exist_ok=True)
-    migrated_count = 0
-    
+def update_template_files(template_path: Path, project_path: Path, delete: bool = False,
+                          workers: int = MAX_IO_WORKERS,
+                          template_files: Optional[TemplateFiles] = None,
+                          link_mode: str = "copy") -> Dict[str, int]:
+    """
+    Update template files in an existing project safely.
+    Only adds missing files or updates unmodified files.
+    Returns a dictionary with statistics about the update operation.
+    """
+    print("\n--- Stage 1: Updating template files safely ---")
+    return sync_template_files(template_path, project_path, overwrite_modified=False,
+                               delete=delete, workers=workers, template_files=template_files,
+                               link_mode=link_mode)
+
+
+def plan_migration(project_path: Path, taken: Optional[Set[str]] = None) -> Dict[str, str]:
+    """
+    Map each legacy document to its place in pages/, as project-relative POSIX
+    paths. Documents whose name is already taken in pages/, or in `taken`, are
+    left out.
+    """
+    taken = taken or set()
+    moves: Dict[str, str] = {}
     for source_rel_path in MIGRATION_SOURCE_DIRS:
         source_dir = project_path / source_rel_path
         if not source_dir.is_dir():
@@ -214,58 +839,344 @@ def migrate_existing_docs(project_path: Path):
             continue
             
         print(f"Scanning '{source_rel_path}'...")
-        for file_path in source_dir.glob("*.md"):
-            target_file_path = target_pages_dir / file_path.name
-            if target_file_path.exists():
+        for file_path in sorted(source_dir.glob("*.md")):
+            new_key = f"pages/{file_path.name}"
+            if (project_path / new_key).exists() or new_key in taken or new_key in moves.values():
                 print(f"  - ⚠️  File '{file_path.name}' already exists in pages/. Skipping.")
-            else:
-                try:
-                    shutil.move(str(file_path), str(target_file_path))
-                    print(f"  - ✅ Moved file: {file_path.name}")
-                    migrated_count += 1
-                except Exception as e:
-                    print(f"  - ❌ Error moving '{file_path.name}': {e}")
+                continue
+            moves[manifest_key(file_path.relative_to(project_path))] = new_key
+    return moves
+
+
+def build_wiki_link_index(moves: Dict[str, str]) -> Dict[str, str]:
+    """
+    Index the old names a moved document can be referenced by in a [[wiki link]]
+    (its path, any trailing part of it, with or without .md, and its file name
+    with .md), all lower-cased, to its page name in pages/. A bare [[name]]
+    already matches the new page and is not indexed.
+    """
+    index: Dict[str, str] = {}
+    for old_key, new_key in moves.items():
+        page_name = posixpath.splitext(posixpath.basename(new_key))[0]
+        parts = old_key.lower().split("/")
+        for start in range(len(parts)):
+            suffix = "/".join(parts[start:])
+            names = [suffix] if start == len(parts) - 1 else [suffix, posixpath.splitext(suffix)[0]]
+            for name in names:
+                index[name] = page_name
+    return index
+
+
+def rewrite_document_links(text: str, old_key: str, new_key: str, moves: Dict[str, str],
+                           wiki_index: Dict[str, str]) -> str:
+    """
+    Rewrite the [[wiki links]] and relative Markdown links of one document
+    after a migration. `old_key` and `new_key` are where the document itself
+    was and is now. Fenced code blocks are left untouched.
+    """
+    old_dir = posixpath.dirname(old_key)
+    new_dir = posixpath.dirname(new_key) or "."
+    document_moved = old_key != new_key
+
+    def rewrite_wiki(match):
+        target = match.group(1).strip()
+        page_name = wiki_index.get(target.lower().lstrip("./"))
+        if page_name is None:
+            return match.group(0)
+        return f"[[{page_name}{match.group(2) or ''}]]"
+
+    def rewrite_markdown(match):
+        target = match.group(2)
+        if LINK_SCHEME_PATTERN.match(target) or target.startswith(("#", "/")):
+            return match.group(0)
+        path, hash_mark, fragment = target.partition("#")
+        resolved = posixpath.normpath(posixpath.join(old_dir, unquote(path)))
+        if resolved.startswith("../"):
+            return match.group(0)  # Outside the project
+        if resolved not in moves and not document_moved:
+            return match.group(0)
+        new_path = posixpath.relpath(moves.get(resolved, resolved), new_dir)
+        if path != unquote(path):
+            new_path = quote(new_path)
+        return f"{match.group(1)}{new_path}{hash_mark}{fragment}{match.group(3)}"
+
+    lines = text.split("\n")
+    in_fence = False
+    for i, line in enumerate(lines):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+            continue
+        if in_fence or ("[" not in line):
+            continue
+        line = WIKI_LINK_PATTERN.sub(rewrite_wiki, line)
+        lines[i] = MARKDOWN_LINK_PATTERN.sub(rewrite_markdown, line)
+    return "\n".join(lines)
+
+
+def rewrite_kb_links(project_path: Path, moves: Dict[str, str], workers: int = MAX_IO_WORKERS) -> int:
+    """
+    Rewrite references to moved documents across the knowledge base in one
+    pass: every Markdown file in LINK_REWRITE_DIRS is read once and checked
+    against the moved-file index, and the changed files are then written
+    atomically as one batch. Returns the number of rewritten files.
+    """
+    wiki_index = build_wiki_link_index(moves)
+    new_to_old = {new_key: old_key for old_key, new_key in moves.items()}
+    documents = []
+    for dir_name in LINK_REWRITE_DIRS:
+        for root, _, files in os.walk(project_path / dir_name):
+            for name in files:
+                path = Path(root) / name
+                # Symlinks point at template files (.roo/rules), which are not ours to edit
+                if name.endswith(".md") and not path.is_symlink():
+                    documents.append(path)
+
+    def rewrite(path: Path) -> Optional[Tuple[Path, bytes]]:
+        original = path.read_bytes()
+        try:
+            text = original.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+        new_key = manifest_key(path.relative_to(project_path))
+        rewritten = rewrite_document_links(text, new_to_old.get(new_key, new_key), new_key, moves, wiki_index)
+        return (path, rewritten.encode("utf-8")) if rewritten != text else None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        changes = [change for change in pool.map(rewrite, documents) if change is not None]
+        list(pool.map(lambda change: materialize_bytes(*change), changes))
+    for path, _ in sorted(changes):
+        print(f"  - 🔗 Updated links in: {manifest_key(path.relative_to(project_path))}")
+    return len(changes)
+
+
+def migrate_existing_docs(project_path: Path, workers: int = MAX_IO_WORKERS):
+    """
+    Migrate existing documentation to pages/ directory and rewrite the links
+    that pointed at the old locations.
+    """
+    print("\n--- Stage 2: Migrating existing documentation to pages/ ---")
+    target_pages_dir = project_path / "pages"
+    target_pages_dir.mkdir(exist_ok=True)
+    
+    planned_moves = plan_migration(project_path)
+    moves: Dict[str, str] = {}
+    for old_key, new_key in planned_moves.items():
+        try:
+            os.replace(str(project_path / old_key), str(project_path / new_key))
+            print(f"  - ✅ Moved file: {posixpath.basename(old_key)}")
+            moves[old_key] = new_key
+        except Exception as e:
+            print(f"  - ❌ Error moving '{posixpath.basename(old_key)}': {e}")
     
-    print(f"\nTotal files migrated: {migrated_count}")
+    print(f"\nTotal files migrated: {len(moves)}")
+    if moves:
+        rewritten = rewrite_kb_links(project_path, moves, workers)
+        print(f"Files with rewritten links: {rewritten}")
+
+
+def symlink_targets(project_path: Path, extra_keys: Iterable[str] = ()) -> Dict[Path, str]:
+    """
+    Return the links that pages/ should have for the rules and commands in
+    .roo/, as {link path: target}. `extra_keys` adds template files that are
+    about to be installed, for planning.
+    """
+    links: Dict[Path, str] = {}
+    pages_dir = project_path / "pages"
+    extra_keys = list(extra_keys)
+    for link_type, source_rel_dir in SYMLINK_SOURCE_DIRS.items():
+        source_dir = project_path / source_rel_dir
+        sources = set(source_dir.glob("*.md")) if source_dir.is_dir() else set()
+        sources.update(
+            project_path / key for key in extra_keys
+            if posixpath.dirname(key) == source_rel_dir and key.endswith(".md")
+        )
+        for source_file in sorted(sources):
+            # Create link name preserving prefixes and original name
+            # For example: "01-quality_guideline.md" -> "rules.01-quality-guideline.md"
+            link_name = f"{link_type}.{source_file.stem.replace('_', '-')}.md"
+            links[pages_dir / link_name] = str(source_file.resolve())
+    return links
+
+
+def scan_page_links(pages_dir: Path) -> Dict[str, Optional[str]]:
+    """
+    Read the rules.* and commands.* entries of pages/ with a single os.scandir,
+    as {name: link target}, with None for regular files (copies).
+    """
+    prefixes = tuple(f"{link_type}." for link_type in SYMLINK_SOURCE_DIRS)
+    entries: Dict[str, Optional[str]] = {}
+    if not pages_dir.is_dir():
+        return entries
+    with os.scandir(str(pages_dir)) as scan:
+        for entry in scan:
+            if not entry.name.startswith(prefixes):
+                continue
+            if entry.is_symlink():
+                entries[entry.name] = os.readlink(entry.path)
+            elif entry.is_file():
+                entries[entry.name] = None
+    return entries
+
+
+def load_link_copies(project_path: Path) -> Dict[str, Dict[str, str]]:
+    """Load {page name: {"target", "hash"}} for pages that are copies instead of links."""
+    try:
+        with open(project_path / LINK_COPIES_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"⚠️  Warning: Could not load page link copies: {e}")
+        return {}
+
+
+def is_managed_page_link(project_path: Path, link_path: Path, link_target: str) -> bool:
+    """
+    True if a pages/ link was made by us and may be removed: its target is
+    dangling or lies under one of SYMLINK_SOURCE_DIRS. Links the user made
+    to files elsewhere are left alone.
+    """
+    target = Path(link_target)
+    if not target.is_absolute():
+        target = link_path.parent / target
+    if not target.exists():
+        return True
+    resolved = target.resolve()
+    for source_rel_dir in SYMLINK_SOURCE_DIRS.values():
+        try:
+            resolved.relative_to((project_path / source_rel_dir).resolve())
+            return True
+        except ValueError:
+            continue
+    return False
+
+
+def plan_symlinks(project_path: Path, extra_keys: Iterable[str] = ()) -> List[Tuple[str, Path, str]]:
+    """
+    Reconcile the links of pages/ with the rules and commands in .roo/ and
+    return (action, link path, target) for each of them. Actions are 'create',
+    'update', 'remove' (a dangling link, or a link into .roo/ whose source is
+    gone), 'skip' (a page that is not ours to replace) and 'unchanged'. Pages
+    that are tracked copies of their source are compared by hash instead of
+    link target; links to files outside .roo/ are the user's and are kept.
+    """
+    pages_dir = project_path / "pages"
+    desired = symlink_targets(project_path, extra_keys)
+    existing = scan_page_links(pages_dir)
+    copies = load_link_copies(project_path)
+    plan = []
+    for link_path, target in desired.items():
+        name = link_path.name
+        if name not in existing:
+            action = 'create'
+        elif existing[name] is not None:
+            action = 'unchanged' if existing[name] == target else 'update'
+        elif name not in copies:
+            action = 'skip'  # A regular page the user created with this name
+        elif calculate_file_hash(link_path) != copies[name]["hash"]:
+            action = 'skip'  # The copy was edited
+        elif copies[name]["target"] != target or not Path(target).exists():
+            action = 'update'
+        else:
+            action = 'unchanged' if calculate_file_hash(Path(target)) == copies[name]["hash"] else 'update'
+        plan.append((action, link_path, target))
+
+    desired_names = {link_path.name for link_path in desired}
+    for name, link_target in sorted(existing.items()):
+        if name in desired_names:
+            continue
+        if link_target is not None:
+            if is_managed_page_link(project_path, pages_dir / name, link_target):
+                plan.append(('remove', pages_dir / name, link_target))
+        elif name in copies and calculate_file_hash(pages_dir / name) == copies[name]["hash"]:
+            plan.append(('remove', pages_dir / name, copies[name]["target"]))
+    return plan
+
+
+def place_page_link(link_path: Path, target: str, as_copy: bool) -> Optional[str]:
+    """
+    Point `link_path` at `target` with a symlink, replacing whatever is there
+    atomically. Where symlinks are unavailable, or `as_copy` is set, the page
+    is a copy of the target instead. Returns the copy's hash, or None for a link.
+    """
+    if not as_copy:
+        temp_link = link_path.with_name(f".{link_path.name}.tmp")
+        try:
+            if temp_link.is_symlink() or temp_link.exists():
+                temp_link.unlink()
+            os.symlink(target, str(temp_link))
+            os.replace(str(temp_link), str(link_path))
+            return None
+        except (OSError, NotImplementedError):
+            if temp_link.is_symlink():
+                temp_link.unlink()
+    data = Path(target).read_bytes()
+    if link_path.is_symlink():
+        link_path.unlink()
+    materialize_bytes(link_path, data)
+    return hashlib.sha256(data).hexdigest()
 
 
 def create_symlinks_in_pages(project_path: Path):
-    """Create symbolic links in pages/ from .roo/ for rules and commands."""
+    """
+    Reconcile the symbolic links in pages/ for the rules and commands in .roo/:
+    only missing or outdated links are (re)created, and links whose source was
+    removed are deleted. Where symlinks are unavailable, pages are copies whose
+    hashes are tracked so that they are updated incrementally as well.
+    """
     print("\n--- Stage 3: Creating symbolic links in pages/ ---")
     
     pages_dir = project_path / "pages"
     pages_dir.mkdir(exist_ok=True)
     
-    source_dirs = {
-        "rules": project_path / ".roo" / "rules",
-        "commands": project_path / ".roo" / "commands"
-    }
-
-    for link_type, source_dir in source_dirs.items():
-        if not source_dir.is_dir():
-            print(f"⚠️  Source directory not found, skipping: {source_dir}")
-            continue
-        
-        for source_file in source_dir.glob("*.md"):
-            # Create link name preserving prefixes and original name
-            # For example: "01-quality_guideline.md" -> "rules.01-quality-guideline.md"
-            link_name = f"{link_type}.{source_file.stem.replace('_', '-')}.md"
-            link_path = pages_dir / link_name
+    for source_rel_dir in SYMLINK_SOURCE_DIRS.values():
+        if not (project_path / source_rel_dir).is_dir():
+            print(f"⚠️  Source directory not found, skipping: {project_path / source_rel_dir}")
+    
+    copies = load_link_copies(project_path)
+    copies_before = dict(copies)
+    unchanged_count = 0
+    copy_fallback_reported = False
 
-            if link_path.exists() or link_path.is_symlink():
+    for action, link_path, target in plan_symlinks(project_path):
+        name = link_path.name
+        try:
+            if action == 'unchanged':
+                unchanged_count += 1
+            elif action == 'skip':
+                print(f"⏭️  Kept existing page (not a link, or an edited copy): '{link_path}'")
+            elif action == 'remove':
                 link_path.unlink()
+                copies.pop(name, None)
+                print(f"🗑️  Removed stale link: '{link_path}'")
+            else:
+                copy_hash = place_page_link(link_path, target, as_copy=name in copies)
+                if copy_hash is None:
+                    copies.pop(name, None)
+                    print(f"✅ {'Created' if action == 'create' else 'Updated'} link: '{link_path}' -> '{target}'")
+                else:
+                    copies[name] = {"target": target, "hash": copy_hash}
+                    if not copy_fallback_reported and name not in copies_before:
+                        print("ℹ️  Symbolic links are not available here, pages are copied instead.")
+                        print("ℹ️  On Windows, creating symbolic links may require running the script as Administrator.")
+                        copy_fallback_reported = True
+                    print(f"✅ {'Copied' if action == 'create' else 'Updated copy'}: '{link_path}' <- '{target}'")
+        except Exception as e:
+            print(f"❌ Error reconciling link '{name}': {e}")
 
-            try:
-                os.symlink(str(source_file.resolve()), str(link_path.resolve()))
-                print(f"✅ Created link: '{link_path}' -> '{source_file}'")
-            except OSError as e:
-                print(f"❌ Error creating link for '{source_file.name}': {e}")
-                print("ℹ️  On Windows, creating symbolic links may require running the script as Administrator.")
-            except Exception as e:
-                print(f"❌ Unknown error creating link for '{source_file.name}': {e}")
+    if copies != copies_before:
+        try:
+            materialize_bytes(project_path / LINK_COPIES_PATH,
+                              json.dumps(dict(sorted(copies.items())), indent=2).encode('utf-8'))
+        except Exception as e:
+            print(f"⚠️  Warning: Could not save page link copies: {e}")
+    if unchanged_count:
+        print(f"ℹ️  {unchanged_count} links already up to date.")
 
 
-def init_project(project_root: Path, template_path: Path):
+def init_project(project_root: Path, template_path: Path, delete: bool = False,
+                 workers: int = MAX_IO_WORKERS, link_mode: str = "copy",
+                 template_files: Optional[TemplateFiles] = None):
     """
     Initialize a new project by copying template files and setting up the structure.
     This is the --init mode implementation.
@@ -281,14 +1192,14 @@ def init_project(project_root: Path, template_path: Path):
     
     if existing_dirs:
         print(f"⚠️  The following directories already exist: {', '.join(existing_dirs)}")
-        print("   They will be overwritten with template files.")
+        print("   Files in them that differ from the template will be overwritten; other files are kept.")
         response = input("Do you want to continue? (y/N): ").strip().lower()
         if response != 'y':
             print("❌ Initialization cancelled by user.")
             return False
     
     # Copy template files
-    copy_template_files(template_path, project_root)
+    copy_template_files(template_path, project_root, delete, workers, link_mode, template_files)
     
     # Create symlinks for rules and commands
     create_symlinks_in_pages(project_root)
@@ -306,7 +1217,9 @@ def init_project(project_root: Path, template_path: Path):
     return True
 
 
-def update_project(project_root: Path, template_path: Path):
+def update_project(project_root: Path, template_path: Path, delete: bool = False,
+                   workers: int = MAX_IO_WORKERS, link_mode: str = "copy",
+                   template_files: Optional[TemplateFiles] = None):
     """
     Update an existing project with new template files safely.
     This is the --update mode implementation.
@@ -315,16 +1228,20 @@ def update_project(project_root: Path, template_path: Path):
     
     # Check if required template directories exist
     missing_dirs = []
+    archive_dirs = {key.split("/", 1)[0] for key in template_files} if template_files is not None else None
     for dir_name in TEMPLATE_DIRS_TO_COPY:
-        source_dir = template_path / dir_name
-        if not source_dir.is_dir():
+        if archive_dirs is not None:
+            if dir_name not in archive_dirs:
+                missing_dirs.append(dir_name)
+        elif not (template_path / dir_name).is_dir():
             missing_dirs.append(dir_name)
     
     if missing_dirs:
         print(f"⚠️  Warning: The following template directories are missing: {', '.join(missing_dirs)}")
     
     # Update template files safely
-    stats = update_template_files(template_path, project_root)
+    stats = update_template_files(template_path, project_root, delete, workers,
+                                  template_files=template_files, link_mode=link_mode)
     
     # Create symlinks for rules and commands (update existing ones)
     create_symlinks_in_pages(project_root)
@@ -333,7 +1250,10 @@ def update_project(project_root: Path, template_path: Path):
     print("\n📊 Update Summary:")
     print(f"   ✅ Added files: {stats['added']}")
     print(f"   🔄 Updated files: {stats['updated']}")
+    print(f"   ➖ Unchanged files: {stats['unchanged']}")
     print(f"   ⏭️  Skipped files (user modified): {stats['skipped']}")
+    if stats['deleted'] > 0:
+        print(f"   🗑️  Deleted files (removed from template): {stats['deleted']}")
     if stats['errors'] > 0:
         print(f"   ❌ Errors: {stats['errors']}")
     
@@ -350,6 +1270,212 @@ def update_project(project_root: Path, template_path: Path):
     return True
 
 
+def load_projects_file(projects_file: Path) -> List[str]:
+    """Read project roots from a file: one path per line, '#' starts a comment."""
+    projects = []
+    for line in projects_file.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            projects.append(line)
+    return projects
+
+
+def update_fleet_project(project_root: str, template_path: str,
+                         template_files: TemplateFiles,
+                         delete: bool = False, workers: int = MAX_IO_WORKERS,
+                         link_mode: str = "copy") -> Dict[str, Any]:
+    """
+    Update one project of a fleet in a worker process and return its report
+    record. The detailed output is captured so that workers do not interleave,
+    and is kept in the record's "output" field.
+    """
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"project_root": project_root, "error": None}
+    output = io.StringIO()
+    try:
+        with redirect_stdout(output):
+            if not Path(project_root).is_dir():
+                raise FileNotFoundError(f"Project root not found: {project_root}")
+            stats = update_template_files(Path(template_path), Path(project_root), delete, workers,
+                                          template_files=template_files, link_mode=link_mode)
+            create_symlinks_in_pages(Path(project_root))
+        result.update(stats)
+    except Exception as e:
+        result["error"] = str(e)
+    result["output"] = output.getvalue()
+    result["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def run_fleet_update(projects: List[str], template_path: Path, report_path: Path,
+                     max_workers: int, delete: bool = False,
+                     workers: int = MAX_IO_WORKERS, link_mode: str = "copy",
+                     template_files: Optional[TemplateFiles] = None) -> int:
+    """
+    Update many projects from one template on a bounded process pool. The
+    template is hashed once and each project's statistics are appended to a
+    JSON-lines report as soon as it finishes. `template_files` may be given
+    when the template was already indexed. Returns the number of failed projects.
+    """
+    # Drop duplicates, keeping the order
+    projects = list(dict.fromkeys(str(Path(project).resolve()) for project in projects))
+    project_workers = max(1, min(max_workers, len(projects)))
+
+    started = time.perf_counter()
+    if template_files is None:
+        template_files = index_template_files(template_path, workers)
+    print(f"ℹ️  Hashed {len(template_files)} template files in {time.perf_counter() - started:.2f}s.")
+    print(f"ℹ️  Updating {len(projects)} projects with {project_workers} workers.")
+
+    results: List[Dict[str, Any]] = []
+    with open(report_path, "w", encoding="utf-8") as report, \
+            ProcessPoolExecutor(max_workers=project_workers) as executor:
+        futures = {
+            executor.submit(update_fleet_project, project, str(template_path), template_files,
+                            delete, workers, link_mode): project
+            for project in projects
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"project_root": futures[future], "error": str(e), "elapsed_seconds": 0.0}
+            report.write(json.dumps(result, ensure_ascii=False) + "\n")
+            report.flush()
+            results.append(result)
+
+            if result["error"]:
+                print(f"❌ {result['project_root']}: {result['error']}")
+            else:
+                print(f"{'⚠️ ' if result['errors'] else '✅'} {result['project_root']}: "
+                      f"{result['added']} added, {result['updated']} updated, "
+                      f"{result['skipped']} skipped, {result['errors']} errors "
+                      f"({result['elapsed_seconds']:.2f}s)")
+            # Per-file errors of the project; the full output is in the report
+            for line in result.get("output", "").splitlines():
+                if line.lstrip().startswith("❌"):
+                    print(f"   {line.strip()}")
+
+    succeeded = [r for r in results if not r["error"]]
+    failed = [r for r in results if r["error"] or r.get("errors")]
+    print("\n📊 Fleet Update Summary:")
+    print(f"   Projects updated: {len(succeeded)} of {len(results)}")
+    print(f"   ✅ Added files: {sum(r['added'] for r in succeeded)}")
+    print(f"   🔄 Updated files: {sum(r['updated'] for r in succeeded)}")
+    print(f"   ⏭️  Skipped files (user modified): {sum(r['skipped'] for r in succeeded)}")
+    if failed:
+        print(f"   ❌ Projects with errors: {len(failed)}")
+    print(f"   Wall time: {time.perf_counter() - started:.2f}s")
+    print(f"📝 Report written to '{report_path}'.")
+    return len(failed)
+
+
+def format_size(size: float) -> str:
+    """Format a byte count for humans."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def plan_project(project_root: Path, template_path: Path, mode: str, delete: bool = False,
+                 workers: int = MAX_IO_WORKERS, template_files: Optional[TemplateFiles] = None) -> int:
+    """
+    Print everything a mode would do to a project, with the data to transfer
+    and an estimated duration, without changing anything. This is the --plan
+    implementation. Returns the number of changes, so that CI can detect drift.
+    """
+    print(f"\n--- 📋 Plan for --{mode} (dry run, nothing is changed) ---")
+    journal = UpdateTransaction(project_root).load_journal()
+    if journal is not None and journal.get("status") != "committed":
+        print("⚠️  An interrupted update would be rolled back first.")
+
+    manifest = load_manifest(project_root / MANIFEST_PATH)
+    started = time.monotonic()
+    plan = plan_template_update(template_path, project_root, manifest, workers,
+                                overwrite_modified=(mode != "update"), delete=delete,
+                                template_files=template_files)
+    planned_keys = [item.key for item in plan if item.action == 'add']
+    moves = plan_migration(project_root, set(planned_keys)) if mode == "migrate" else {}
+    links = plan_symlinks(project_root, planned_keys)
+    elapsed = time.monotonic() - started
+
+    transfer_bytes = 0
+    hash_count = 0
+    hash_bytes = 0
+    counts: Dict[str, int] = {}
+    print()
+    for item in sorted(plan, key=lambda planned_item: planned_item.key):
+        counts[item.action] = counts.get(item.action, 0) + 1
+        if item.source is not None:
+            size = len(item.source) if isinstance(item.source, bytes) else item.source.stat().st_size
+            if template_files is None:
+                hash_count += 1
+                hash_bytes += size
+            if item.action in ('add', 'update'):
+                transfer_bytes += size
+        if item.action in ('update', 'unchanged', 'skip', 'delete') and not stat_matches_entry(item.target, item.entry):
+            hash_count += 1
+            hash_bytes += item.target.stat().st_size
+        if item.action in ('add', 'update', 'skip', 'delete', 'error'):
+            print(f"  {item.action:<8} {item.key}")
+    for old_key, new_key in moves.items():
+        print(f"  {'move':<8} {old_key} -> {new_key}")
+    for action, link_path, target in links:
+        if action in ('create', 'update'):
+            print(f"  {'symlink':<8} {manifest_key(link_path.relative_to(project_root))} -> {target}")
+        elif action == 'remove':
+            print(f"  {'unlink':<8} {manifest_key(link_path.relative_to(project_root))}")
+
+    changed_links = sum(1 for action, _, _ in links if action in ('create', 'update', 'remove'))
+    changes = counts.get('add', 0) + counts.get('update', 0) + counts.get('delete', 0) + len(moves) + changed_links
+    estimate = (hash_bytes / PLAN_HASH_BYTES_PER_SECOND + transfer_bytes / PLAN_COPY_BYTES_PER_SECOND
+                + (len(plan) + len(moves) + changed_links) * PLAN_SECONDS_PER_FILE)
+
+    print("\n📊 Plan Summary:")
+    print(f"   ✅ Files to add: {counts.get('add', 0)}")
+    print(f"   🔄 Files to update: {counts.get('update', 0)}")
+    print(f"   ➖ Unchanged files: {counts.get('unchanged', 0)}")
+    print(f"   ⏭️  Files to skip (user modified): {counts.get('skip', 0)}")
+    print(f"   🗑️  Files to delete: {counts.get('delete', 0)}")
+    if mode == "migrate":
+        print(f"   📦 Documents to move: {len(moves)}")
+    print(f"   🔗 Links to create, update or remove: {changed_links}")
+    if counts.get('error'):
+        print(f"   ❌ Unreadable files: {counts['error']}")
+    print(f"   Bytes to transfer: {format_size(transfer_bytes)}")
+    print(f"   Files to hash: {hash_count} ({format_size(hash_bytes)})")
+    print(f"   Estimated duration: ~{estimate:.2f}s with a cold cache (planning took {elapsed:.2f}s)")
+    if changes:
+        print(f"\n⚠️  Project differs from the template: {changes} changes planned.")
+    else:
+        print("\n✅ Project is in sync with the template.")
+    return changes
+
+
+def run_mode(args, project_root: Path, template_path: Path,
+             template_files: Optional[TemplateFiles] = None):
+    """Run the mode selected on the command line against one project."""
+    if args.init:
+        # Initialize new project
+        return init_project(project_root, template_path, args.delete, args.workers, args.link_mode,
+                            template_files)
+    if args.migrate:
+        # Migrate existing project
+        copy_template_files(template_path, project_root, args.delete, args.workers, args.link_mode,
+                            template_files)
+        migrate_existing_docs(project_root, args.workers)
+        create_symlinks_in_pages(project_root)
+        
+        print("\n🎉 Migration process completed!")
+        print("➡️  It is recommended to run `uv run python scripts/development/generate_logseq_config.py` to update graph configuration.")
+        return True
+    # Update existing project
+    return update_project(project_root, template_path, args.delete, args.workers, args.link_mode,
+                          template_files)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Bootstrap script for RooCode project template initialization, migration, and updates.",
@@ -357,51 +1483,110 @@ def main():
                "  python bootstrap.py --init          # Initialize new project\n"
                "  python bootstrap.py --migrate       # Migrate existing project\n"
                "  python bootstrap.py --update        # Update existing project with latest template\n"
-               "  python bootstrap.py --init --repo https://github.com/user/custom-template.git",
+               "  python bootstrap.py --rollback      # Undo the last update\n"
+               "  python bootstrap.py --update --plan # Show what would change; exit status 1 on drift\n"
+               "  python bootstrap.py --migrate --delete  # Also remove files the template no longer has\n"
+               "  python bootstrap.py --init --repo https://github.com/user/custom-template.git\n"
+               "  python bootstrap.py --update --template-path ../roo-project-template  # Offline, from a local checkout\n"
+               "  python bootstrap.py --update --projects projects.txt  # Update every project listed in the file\n"
+               "  python bootstrap.py --init --template-archive template.tar.gz  # From a vendored archive",
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     
     parser.add_argument("--init", action='store_true', help="Initialize a new project with RooCode template files")
     parser.add_argument("--migrate", action='store_true', help="Migrate existing documentation to pages/ directory")
     parser.add_argument("--update", action='store_true', help="Update existing project with latest template files (safe update)")
+    parser.add_argument("--rollback", action='store_true', help="Undo the last template update of the project")
     parser.add_argument("--repo", type=str, default="https://github.com/ozand/roo-project-template.git", 
                        help="URL of the RooCode template repository (default: official template)")
+    parser.add_argument("--template-path", type=str,
+                       help="Use a local template checkout instead of fetching --repo (works offline)")
+    parser.add_argument("--template-archive", type=str,
+                       help="Read the template from a .tar.gz/.tar/.zip archive instead of fetching --repo")
+    parser.add_argument("--cache-dir", type=str, default=str(TEMPLATE_CACHE_DIR),
+                       help=f"Where fetched templates are cached (default: {TEMPLATE_CACHE_DIR})")
+    parser.add_argument("--projects", type=str,
+                       help="With --update: file listing project roots (one per line) to update from one template fetch")
+    parser.add_argument("--project-workers", type=int, default=os.cpu_count() or 1,
+                       help="Projects updated in parallel with --projects (default: CPU count)")
+    parser.add_argument("--report", type=str, default="bootstrap_fleet_report.jsonl",
+                       help="JSON-lines report written with --projects (default: bootstrap_fleet_report.jsonl)")
+    parser.add_argument("--plan", action='store_true',
+                       help="Show what the mode would change, with a cost estimate, without touching the project; "
+                            "exits with status 1 if anything would change")
+    parser.add_argument("--delete", action='store_true',
+                       help="Delete unmodified files installed from the template that the template no longer has")
+    parser.add_argument("--link-mode", choices=LINK_MODES, default="copy",
+                       help="How template files are placed: plain copies, copy-on-write clones where the "
+                            "filesystem supports them, or hardlinks to the template for read-only files "
+                            f"({', '.join(HARDLINK_DIRS)}) plus clones for the rest (default: copy)")
+    parser.add_argument("--workers", type=int, default=MAX_IO_WORKERS,
+                       help=f"Threads used to hash and copy template files (default: {MAX_IO_WORKERS})")
     
     args = parser.parse_args()
     
     # Validate that exactly one mode is specified
-    mode_count = sum([args.init, args.migrate, args.update])
+    mode_count = sum([args.init, args.migrate, args.update, args.rollback])
     if mode_count == 0:
-        parser.error("Please specify one of --init, --migrate, or --update mode")
+        parser.error("Please specify one of --init, --migrate, --update, or --rollback mode")
     elif mode_count > 1:
-        parser.error("Please specify only one mode: --init, --migrate, or --update")
+        parser.error("Please specify only one mode: --init, --migrate, --update, or --rollback")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.template_archive and args.template_path:
+        parser.error("Use either --template-archive or --template-path, not both")
+    if args.plan and (args.rollback or args.projects):
+        parser.error("--plan can be used with --init, --migrate or --update, without --projects")
+    if args.projects and not args.update:
+        parser.error("--projects can only be used with --update")
     
     project_root = Path.cwd()
 
-    with tempfile.TemporaryDirectory() as temp_dir:
-        print(f"Cloning template from {args.repo}...")
-        if not run_command(["git", "clone", args.repo, "."], cwd=temp_dir):
-            print("❌ Failed to clone template repository. Aborting execution.")
+    if args.rollback:
+        # Rolling back only needs the journal, not the template
+        if not rollback_project(project_root):
+            sys.exit(1)
+        return
+
+    template_files = None
+    if args.template_archive:
+        template_path = Path(args.template_archive).resolve()
+        started = time.monotonic()
+        try:
+            template_files = index_template_archive(template_path)
+        except (OSError, tarfile.TarError, zipfile.BadZipFile) as e:
+            print(f"❌ Could not read template archive {template_path}: {e}")
+            sys.exit(1)
+        print(f"ℹ️  Read {len(template_files)} template files from {template_path.name} "
+              f"in {time.monotonic() - started:.2f}s")
+    elif args.template_path:
+        template_path = Path(args.template_path).resolve()
+        if not template_path.is_dir():
+            print(f"❌ Template path not found: {template_path}")
+            return
+    else:
+        template_path = fetch_template(args.repo, Path(args.cache_dir).expanduser())
+        if template_path is None:
+            print("❌ Failed to fetch template repository. Aborting execution.")
             return
 
-        template_path = Path(temp_dir)
-        
-        if args.init:
-            # Initialize new project
-            if not init_project(project_root, template_path):
-                return
-        elif args.migrate:
-            # Migrate existing project
-            copy_template_files(template_path, project_root)
-            migrate_existing_docs(project_root)
-            create_symlinks_in_pages(project_root)
-            
-            print("\n🎉 Migration process completed!")
-            print("➡️  It is recommended to run `uv run python scripts/development/generate_logseq_config.py` to update graph configuration.")
-        elif args.update:
-            # Update existing project
-            if not update_project(project_root, template_path):
-                return
+    if args.projects:
+        projects = load_projects_file(Path(args.projects))
+        if not projects:
+            print(f"❌ No projects listed in {args.projects}")
+            sys.exit(1)
+        if run_fleet_update(projects, template_path, Path(args.report), args.project_workers,
+                            args.delete, args.workers, args.link_mode, template_files):
+            sys.exit(1)
+        return
+
+    if args.plan:
+        mode = "init" if args.init else "migrate" if args.migrate else "update"
+        if plan_project(project_root, template_path, mode, args.delete, args.workers, template_files):
+            sys.exit(1)
+        return
+
+    run_mode(args, project_root, template_path, template_files)
 
 
 if __name__ == "__main__":
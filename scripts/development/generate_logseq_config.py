@@ -1,13 +1,332 @@
 # scripts/development/generate_logseq_config.py
+import argparse
+import fnmatch
 import os
 from pathlib import Path
+from typing import List, Optional, Set, Tuple
 
-def generate_logseq_config():
+from kb_io import DocumentCache, materialize_text
+
+# Комментарий, которым помечается сгенерированный блок :hidden
+GENERATED_COMMENT = ";; Этот блок сгенерирован автоматически скриптом generate_logseq_config.py"
+# Символы, которыми заканчивается атом EDN (ключевое слово, символ, число)
+EDN_DELIMITERS = set('()[]{}",;')
+
+# Файлы, которые Logseq индексирует как документы базы знаний
+KB_FILE_SUFFIXES = {".md", ".org"}
+# Поддерево считается "тяжелым", если в нем больше файлов или байт, чем здесь
+HEAVY_SUBTREE_FILES = 500
+HEAVY_SUBTREE_BYTES = 50 * 1024 * 1024
+# Доля документов базы знаний, ниже которой тяжелое поддерево не считается частью базы
+KB_FILE_SHARE = 0.5
+# Сколько самых дорогих поддеревьев показывать в отчете
+REPORT_SIZE = 10
+
+# Токен EDN: (тип, начало, конец, глубина вложенности)
+EdnToken = Tuple[str, int, int, int]
+
+
+def scan_edn(text: str) -> List[EdnToken]:
+    """
+    Минимальный лексер EDN: разбивает текст на токены 'open', 'close',
+    'string', 'comment' и 'atom' с позициями в исходном тексте. Его достаточно,
+    чтобы находить значения ключей, не трогая остальной текст файла.
+    """
+    tokens: List[EdnToken] = []
+    depth = 0
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if ch.isspace() or ch == ",":
+            i += 1
+        elif ch == ";":
+            end = text.find("\n", i)
+            end = n if end == -1 else end
+            tokens.append(("comment", i, end, depth))
+            i = end
+        elif ch == '"':
+            end = i + 1
+            while end < n and text[end] != '"':
+                end += 2 if text[end] == "\\" else 1
+            end = min(end + 1, n)
+            tokens.append(("string", i, end, depth))
+            i = end
+        elif ch == "#" and i + 1 < n and text[i + 1] in "{(":
+            # Множество #{...} и анонимная функция #(...)
+            tokens.append(("open", i, i + 2, depth))
+            depth += 1
+            i += 2
+        elif ch in "([{":
+            tokens.append(("open", i, i + 1, depth))
+            depth += 1
+            i += 1
+        elif ch in ")]}":
+            depth -= 1
+            tokens.append(("close", i, i + 1, depth))
+            i += 1
+        else:
+            # Литерал символа (\a, \newline) захватывает следующий символ в любом случае
+            end = i + 2 if ch == "\\" else i + 1
+            while end < n and not text[end].isspace() and text[end] not in EDN_DELIMITERS:
+                end += 1
+            tokens.append(("atom", i, end, depth))
+            i = end
+    return tokens
+
+
+def find_form_end(tokens: List[EdnToken], index: int) -> int:
+    """Возвращает индекс последнего токена формы, начинающейся с tokens[index]."""
+    kind, _, _, depth = tokens[index]
+    if kind != "open":
+        return index
+    for j in range(index + 1, len(tokens)):
+        if tokens[j][0] == "close" and tokens[j][3] == depth:
+            return j
+    return len(tokens) - 1
+
+
+def find_edn_key(text: str, tokens: List[EdnToken], key: str) -> Tuple[Optional[Tuple[int, int]], Optional[int]]:
+    """
+    Ищет значение ключа верхнего уровня конфигурации. Если файл - это одна
+    карта {...}, ключ ищется среди ее ключей, иначе (старый формат без скобок)
+    среди форм верхнего уровня. Возвращает (индексы первого и последнего токена
+    значения или None, позиция закрывающей скобки карты или None).
+    """
+    forms = [i for i, token in enumerate(tokens) if token[0] != "comment"]
+    map_close = None
+    key_depth = 0
+    if forms and tokens[forms[0]][0] == "open" and text[tokens[forms[0]][1]] == "{":
+        key_depth = 1
+        map_close = tokens[find_form_end(tokens, forms[0])][1]
+
+    position = 0  # Четные формы на уровне ключей - ключи, нечетные - значения
+    i = forms[0] + 1 if key_depth else 0
+    while i < len(tokens):
+        kind, start, end, depth = tokens[i]
+        if depth < key_depth or (kind == "close" and depth == key_depth - 1):
+            break
+        if kind == "comment":
+            i += 1
+            continue
+        form_end = find_form_end(tokens, i)
+        if position % 2 == 0 and kind == "atom" and text[start:end] == key:
+            value = i + 1
+            while value < len(tokens) and tokens[value][0] == "comment":
+                value += 1
+            if value < len(tokens) and tokens[value][0] != "close":
+                return (value, find_form_end(tokens, value)), map_close
+            return None, map_close
+        position += 1
+        i = form_end + 1
+    return None, map_close
+
+
+def read_edn_strings(text: str, tokens: List[EdnToken], first: int, last: int) -> Set[str]:
+    """Возвращает строки, непосредственно входящие в вектор tokens[first..last]."""
+    depth = tokens[first][3] + 1
+    return {
+        text[start + 1:end - 1].replace('\\"', '"').replace("\\\\", "\\")
+        for kind, start, end, token_depth in tokens[first + 1:last]
+        if kind == "string" and token_depth == depth
+    }
+
+
+def read_hidden_value(text: str) -> Set[str]:
+    """Возвращает текущие записи :hidden из текста config.edn."""
+    tokens = scan_edn(text)
+    value, _ = find_edn_key(text, tokens, ":hidden")
+    if value is None or tokens[value[0]][0] != "open":
+        return set()
+    return read_edn_strings(text, tokens, value[0], value[1])
+
+
+def format_edn_vector(items: List[str], multiline_indent: Optional[str] = None) -> str:
+    """Форматирует вектор строк EDN в одну строку или по элементу на строку."""
+    quoted = ['"' + item.replace("\\", "\\\\").replace('"', '\\"') + '"' for item in items]
+    if multiline_indent is None or not quoted:
+        return "[" + " ".join(quoted) + "]"
+    return "[" + ("\n" + multiline_indent).join(quoted) + "]"
+
+
+def update_hidden_value(text: str, hidden: List[str]) -> Optional[str]:
+    """
+    Заменяет в тексте config.edn только значение :hidden, сохраняя остальной
+    текст байт в байт. Если ключа нет, он добавляется в конец карты.
+    Возвращает None, если набор скрытых директорий уже совпадает.
+    """
+    tokens = scan_edn(text)
+    value, map_close = find_edn_key(text, tokens, ":hidden")
+    if value is not None:
+        first, last = value
+        start, end = tokens[first][1], tokens[last][2]
+        if tokens[first][0] == "open" and read_edn_strings(text, tokens, first, last) == set(hidden):
+            return None
+        indent = None
+        if "\n" in text[start:end] and first + 1 < last:
+            # Многострочный вектор сохраняет свой отступ
+            line_start = text.rfind("\n", 0, tokens[first + 1][1]) + 1
+            indent = " " * (tokens[first + 1][1] - line_start)
+        return text[:start] + format_edn_vector(hidden, indent) + text[end:]
+
+    newline = "\r\n" if "\r\n" in text else "\n"
+    block = f" {GENERATED_COMMENT}{newline} :hidden {format_edn_vector(hidden)}"
+    if map_close is not None:
+        before = text[:map_close].rstrip(" \t")
+        if not before.endswith("\n"):
+            before += newline
+        return before + block + text[map_close:]
+    if text.strip():
+        return text.rstrip("\r\n") + newline + block + newline
+    return "{" + block.lstrip() + "}" + newline
+
+
+class GitIgnore:
+    """
+    Упрощенные правила корневого .gitignore: шаблоны fnmatch, '/' в начале
+    привязывает шаблон к корню, '/' в конце - только к директориям, '!'
+    отменяет исключение. Побеждает последнее подходящее правило, как в Git.
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.rules: List[Tuple[str, bool, bool, bool]] = []
+        for line in patterns:
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            line = line.lstrip("!")
+            dir_only = line.endswith("/")
+            anchored = line.startswith("/") or "/" in line.strip("/")
+            line = line.strip("/")
+            self.rules.append((line.replace("**/", "*"), negated, dir_only, anchored))
+
+    @classmethod
+    def load(cls, project_root: Path) -> "GitIgnore":
+        gitignore = project_root / ".gitignore"
+        if not gitignore.is_file():
+            return cls([])
+        return cls(gitignore.read_text(encoding="utf-8", errors="replace").splitlines())
+
+    def ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Проверяет путь относительно корня проекта (с разделителями '/')."""
+        name = rel_path.rsplit("/", 1)[-1]
+        result = False
+        for pattern, negated, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if fnmatch.fnmatch(rel_path if anchored else name, pattern):
+                result = not negated
+        return result
+
+
+class SubtreeStats:
+    """Сколько файлов и байт Logseq пришлось бы просмотреть в поддереве."""
+
+    __slots__ = ("path", "files", "kb_files", "size", "children", "ignored")
+
+    def __init__(self, path: str, ignored: bool = False):
+        self.path = path
+        self.files = 0
+        self.kb_files = 0
+        self.size = 0
+        self.children: List["SubtreeStats"] = []
+        # Поддерево исключено .gitignore и поэтому не обходилось
+        self.ignored = ignored
+
+    @property
+    def is_heavy(self) -> bool:
+        return self.files > HEAVY_SUBTREE_FILES or self.size > HEAVY_SUBTREE_BYTES
+
+    @property
+    def is_kb_content(self) -> bool:
+        return self.files > 0 and self.kb_files / self.files >= KB_FILE_SHARE
+
+
+def measure_subtree(directory: str, rel_path: str, gitignore: GitIgnore,
+                    hidden: Set[str] = frozenset()) -> SubtreeStats:
+    """
+    Обходит поддерево через os.scandir, считая файлы, документы базы знаний и
+    байты в каждой директории. Директории из `hidden`, скрытые (с точкой) и
+    исключенные .gitignore не обходятся (отсекаются целиком).
+    """
+    stats = SubtreeStats(rel_path)
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                child_rel = f"{rel_path}/{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name.startswith(".") or child_rel in hidden:
+                        continue
+                    if gitignore.ignored(child_rel, is_dir=True):
+                        stats.children.append(SubtreeStats(child_rel, ignored=True))
+                        continue
+                    child = measure_subtree(entry.path, child_rel, gitignore, hidden)
+                    stats.children.append(child)
+                    stats.files += child.files
+                    stats.kb_files += child.kb_files
+                    stats.size += child.size
+                elif entry.is_file(follow_symlinks=False) and not gitignore.ignored(child_rel, is_dir=False):
+                    stats.files += 1
+                    stats.size += entry.stat(follow_symlinks=False).st_size
+                    if os.path.splitext(entry.name)[1].lower() in KB_FILE_SUFFIXES:
+                        stats.kb_files += 1
+    except OSError as e:
+        print(f"⚠️  Не удалось прочитать '{rel_path}': {e}")
+    return stats
+
+
+def find_heavy_subtrees(stats: SubtreeStats) -> List[SubtreeStats]:
+    """
+    Возвращает поддеревья, которые стоит скрыть: исключенные .gitignore и
+    тяжелые поддеревья, в которых документы базы знаний в меньшинстве. Внутрь
+    найденного поддерева поиск не спускается.
+    """
+    found = []
+    for child in stats.children:
+        if child.ignored or (child.is_heavy and not child.is_kb_content):
+            found.append(child)
+        else:
+            found.extend(find_heavy_subtrees(child))
+    return found
+
+
+def format_size(size: float) -> str:
+    """Форматирует размер в байтах для отчета."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def print_indexing_report(trees: List[SubtreeStats], proposed: Set[str], limit: int = REPORT_SIZE):
+    """Печатает самые дорогие для индексации поддеревья базы знаний."""
+    subtrees: List[SubtreeStats] = []
+    pending = list(trees)
+    while pending:
+        stats = pending.pop()
+        if not stats.ignored:
+            subtrees.append(stats)
+            pending.extend(stats.children)
+    subtrees.sort(key=lambda item: (item.files, item.size), reverse=True)
+
+    print(f"\n📊 Самые дорогие для индексации поддеревья (топ {limit}):")
+    for stats in subtrees[:limit]:
+        mark = " ⚠️  предлагается скрыть" if stats.path in proposed else ""
+        print(f"   {stats.path}: {stats.files} файлов ({stats.kb_files} документов), "
+              f"{format_size(stats.size)}{mark}")
+
+
+def generate_logseq_config(hide_heavy: bool = False, project_root: Optional[Path] = None):
     """
     Анализирует структуру проекта и генерирует/обновляет logseq/config.edn,
     автоматически скрывая все директории, не относящиеся к базе знаний.
+    Тяжелые поддеревья внутри директорий базы знаний предлагаются к скрытию,
+    а с hide_heavy=True добавляются в :hidden. По умолчанию корнем проекта
+    считается каталог на два уровня выше скрипта.
     """
-    project_root = Path(__file__).parent.parent.parent
+    project_root = project_root or Path(__file__).parent.parent.parent
     logseq_dir = project_root / "logseq"
     config_path = logseq_dir / "config.edn"
 
@@ -24,41 +343,82 @@ def generate_logseq_config():
 
     # --- Сканируем корневую директорию проекта ---
     root_items = [item.name for item in project_root.iterdir() if item.is_dir()]
-    
+
     # --- Определяем папки, которые нужно скрыть ---
     # Это все папки, которые НЕ входят в наш "белый список"
-    hidden_dirs = sorted([
-        f'"{item}"' for item in root_items if item not in knowledge_base_dirs
-    ])
-    
-    hidden_dirs_str = " ".join(hidden_dirs)
-    print(f"Обнаружены следующие директории для скрытия: {hidden_dirs_str}")
-
-    # --- Формируем содержимое config.edn ---
-    # Мы целенаправленно перезаписываем только ключ :hidden,
-    # чтобы не затереть другие возможные настройки.
-    
+    hidden_dirs = sorted(item for item in root_items if item not in knowledge_base_dirs)
+    print(f"Обнаружены следующие директории для скрытия: {format_edn_vector(hidden_dirs)}")
+
+    # --- Читаем существующий config.edn; заменяться будет только значение :hidden ---
     config_content = ""
     if config_path.exists():
         print("Найден существующий config.edn. Сохраняю другие настройки...")
-        lines = config_path.read_text(encoding="utf-8").splitlines()
-        # Отфильтровываем старые настройки :hidden
-        other_lines = [line for line in lines if not line.strip().startswith(":hidden")]
-        config_content = "\n".join(other_lines).strip()
-    
-    if config_content:
-        config_content += "\n"
-        
-    config_content += f" ;; Этот блок сгенерирован автоматически скриптом generate_logseq_config.py\n :hidden [{hidden_dirs_str}]"
-
-    # --- Записываем файл ---
-    config_path.write_text(config_content, encoding="utf-8")
-    print(f"\nФайл '{config_path}' успешно обновлен.")
+        # Читаем байты, чтобы сохранить окончания строк как есть
+        config_content = config_path.read_bytes().decode("utf-8")
+
+    # Вложенные записи (добавленные вручную или через --hide-heavy) сохраняются, пока путь существует
+    hidden_dirs = sorted(set(hidden_dirs) | {
+        entry for entry in read_hidden_value(config_content)
+        if "/" in entry.strip("/") and (project_root / entry.strip("/")).exists()
+    })
+
+    # --- Измеряем поддеревья базы знаний; скрытые директории не обходим ---
+    gitignore = GitIgnore.load(project_root)
+    trees = [
+        measure_subtree(str(project_root / name), name, gitignore, set(hidden_dirs))
+        for name in sorted(knowledge_base_dirs - {"logseq"})
+        if (project_root / name).is_dir()
+    ]
+    heavy = [subtree for tree in trees for subtree in find_heavy_subtrees(tree)]
+    heavy_paths = {subtree.path for subtree in heavy}
+    print_indexing_report(trees, heavy_paths)
+    if heavy:
+        print("\nТяжелые поддеревья, не относящиеся к базе знаний:")
+        for subtree in heavy:
+            reason = "исключено в .gitignore" if subtree.ignored else (
+                f"{subtree.files} файлов, {format_size(subtree.size)}")
+            print(f"   - {subtree.path} ({reason})")
+        new_paths = heavy_paths - set(hidden_dirs)
+        if hide_heavy:
+            hidden_dirs = sorted(set(hidden_dirs) | heavy_paths)
+        elif new_paths:
+            print("Запустите с --hide-heavy, чтобы добавить их в :hidden.")
+
+    new_content = update_hidden_value(config_content, hidden_dirs)
+    if new_content is None:
+        print(f"\nНабор скрытых директорий не изменился, файл '{config_path}' не перезаписан.")
+        return
+
+    # --- Записываем файл, только если содержимое изменилось ---
+    if materialize_text(config_path, new_content):
+        print(f"\nФайл '{config_path}' успешно обновлен.")
+    else:
+        print(f"\nФайл '{config_path}' не изменился, запись пропущена.")
     print("\nСодержимое config.edn:")
     print("--------------------")
-    print(config_content)
+    print(new_content)
     print("--------------------")
 
 
+def add_step_arguments(parser):
+    """Аргументы генерации; используются и в main(), и шагом generate-config в kb.py."""
+    parser.add_argument("--hide-heavy", action="store_true",
+                        help="Добавить в :hidden тяжелые поддеревья, не относящиеся к базе знаний")
+
+
+def run_step(args: argparse.Namespace, documents: Optional[DocumentCache] = None) -> int:
+    """Запускает генерацию как шаг kb.py. config.edn не markdown-документ, поэтому общий кэш не нужен."""
+    generate_logseq_config(hide_heavy=args.hide_heavy, project_root=args.project_root)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генерация logseq/config.edn для базы знаний проекта.")
+    parser.add_argument("--project-root", type=Path, default=None,
+                        help="Корень проекта (по умолчанию - на два уровня выше скрипта)")
+    add_step_arguments(parser)
+    run_step(parser.parse_args())
+
+
 if __name__ == "__main__":
-    generate_logseq_config()
\ No newline at end of file
+    main()
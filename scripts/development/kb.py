@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the knowledge base scripts.
+
+Each step is one of the existing scripts, run in this process instead of a
+separate interpreter:
+
+- validate         validate_kb.py
+- sync-git         sync_git_kb.py
+- update-status    update_documentation_status.py
+- generate-config  generate_logseq_config.py
+
+Several steps can be chained in one invocation; they run in the order given,
+from the project root, and share one DocumentCache so that a page read by one
+step is not read and decoded again by the next unless it changed on disk in
+between. A step's module is imported only when the step is requested, and its
+options are accepted only then.
+
+Usage:
+    python scripts/development/kb.py validate
+    python scripts/development/kb.py validate sync-git update-status \\
+        --report-path kb-sync.json --commit-range ORIG_HEAD..HEAD
+    python scripts/development/kb.py generate-config --hide-heavy
+
+The exit status is non-zero if any step failed; later steps still run.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, List, Optional, Tuple
+
+from kb_io import DocumentCache
+
+# Step name -> module providing run_step(args, documents) and, if the step has
+# options, add_step_arguments(parser)
+STEPS = {
+    "validate": "validate_kb",
+    "sync-git": "sync_git_kb",
+    "update-status": "update_documentation_status",
+    "generate-config": "generate_logseq_config",
+}
+
+
+def build_parser(argv: List[str]) -> Tuple[argparse.ArgumentParser, Dict[str, ModuleType]]:
+    """
+    Build the command-line parser, importing only the modules of the steps
+    named in argv and registering their options.
+    """
+    parser = argparse.ArgumentParser(
+        prog="kb",
+        description="Run knowledge base maintenance steps in one process.",
+        epilog="Run 'kb STEP --help' to see the options of a step.",
+    )
+    parser.add_argument("steps", nargs="+", choices=list(STEPS), metavar="STEP",
+                        help=f"Steps to run, in order: {', '.join(STEPS)}")
+    parser.add_argument("--project-root", type=Path, default=Path.cwd(),
+                        help="Root directory of the project (default: current directory)")
+
+    modules: Dict[str, ModuleType] = {}
+    for step in STEPS:
+        if step not in argv:
+            continue
+        module = importlib.import_module(STEPS[step])
+        modules[step] = module
+        add_step_arguments = getattr(module, "add_step_arguments", None)
+        if add_step_arguments is not None:
+            add_step_arguments(parser.add_argument_group(f"{step} options"))
+    return parser, modules
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    parser, modules = build_parser(argv)
+    # Steps and options may be interleaved: kb validate sync-git --apply update-status
+    args = parser.parse_intermixed_args(argv)
+    args.project_root = args.project_root.resolve()
+    if not args.project_root.is_dir():
+        parser.error(f"project root '{args.project_root}' is not a directory")
+    # The scripts resolve relative paths (pages/, git ranges) from the project root
+    os.chdir(str(args.project_root))
+
+    documents = DocumentCache()
+    failed: List[str] = []
+    started = time.perf_counter()
+    for step in args.steps:
+        print(f"\n🔄 kb {step}")
+        step_started = time.perf_counter()
+        exit_code = modules[step].run_step(args, documents)
+        elapsed = time.perf_counter() - step_started
+        if exit_code:
+            failed.append(step)
+            print(f"❌ {step} failed ({elapsed:.2f}s)")
+        else:
+            print(f"✅ {step} finished ({elapsed:.2f}s)")
+
+    if len(args.steps) > 1:
+        print(f"\n📊 {len(args.steps)} steps in {time.perf_counter() - started:.2f}s; "
+              f"document reads: {documents.misses} from disk, {documents.hits} from cache")
+    if failed:
+        print(f"❌ Failed steps: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Concurrency-safe document writes for the knowledge base scripts.
+
+The documentation scripts are triggered from Git hooks and CI, so several
+invocations can touch the same pages at once (for example a rebase that
+replays commits). This module gives them one write path:
+
+- an advisory lock per document, held in a lock file under the repository's
+  `.git/kb-locks` (or the system temp directory outside a repository), so
+  lock files never show up in the working tree
+- a compare-and-swap check that the document still has the content that was
+  read before it was modified
+- writes through a temporary file, `fsync` and an atomic rename
+- a retry helper that re-runs a read-modify-write cycle under contention
+- "materialize" helpers that skip the write entirely when the file on disk
+  already matches, so unchanged runs do not make Logseq re-index
+- a read cache, DocumentCache, that lets several steps run in one process
+  (see kb.py) share the documents they read
+
+Locks are re-entrant within a process, so a whole read-modify-write cycle can
+run under locked_documents() and still commit through commit_documents().
+
+Usage:
+    with locked_documents(paths):
+        ...read and modify...
+        commit_documents({path: (original_bytes, new_bytes)})
+"""
+
+import hashlib
+import os
+import random
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+T = TypeVar("T")
+
+# Directory, inside the repository's Git directory, that holds the lock files
+LOCK_DIR_NAME = "kb-locks"
+# How long to wait for a document lock before giving up
+LOCK_TIMEOUT_SECONDS = 10.0
+# Read-modify-write attempts before a conflicting update is reported as failed
+WRITE_ATTEMPTS = 5
+
+# Documents locked by this process, with nesting depth, so that locks are re-entrant
+_held_locks: Dict[Path, int] = {}
+
+
+class DocumentLockTimeout(Exception):
+    """Raised when a document lock could not be acquired in time."""
+
+
+class DocumentConflictError(Exception):
+    """Raised when a document changed on disk after it was read."""
+
+
+def lock_dir_for(directory: Path) -> Path:
+    """
+    Return the directory holding the lock files of documents in `directory`:
+    kb-locks in the Git directory of the enclosing repository (worktrees
+    included), or in the system temp directory outside a repository.
+    """
+    for parent in [directory, *directory.parents]:
+        git_path = parent / ".git"
+        if git_path.is_dir():
+            return git_path / LOCK_DIR_NAME
+        if git_path.is_file():
+            # Worktrees and submodules: ".git" is a file with "gitdir: <path>"
+            content = git_path.read_text(encoding="utf-8").strip()
+            if content.startswith("gitdir:"):
+                return (parent / content[len("gitdir:"):].strip()).resolve() / LOCK_DIR_NAME
+    return Path(tempfile.gettempdir()) / LOCK_DIR_NAME
+
+
+def lock_path_for(path: Path) -> Path:
+    """Return the advisory lock file used for a document."""
+    path = Path(os.path.abspath(str(path)))
+    # Documents with the same name in different directories get different locks
+    digest = hashlib.sha1(str(path).encode("utf-8")).hexdigest()[:16]
+    return lock_dir_for(path.parent) / f"{path.name}.{digest}.lock"
+
+
+def _try_lock(fd: int) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def document_lock(path: Path, timeout: float = LOCK_TIMEOUT_SECONDS) -> Iterator[None]:
+    """
+    Hold the advisory lock of one document, polling with backoff until timeout.
+    Re-entering the lock of a document this process already holds is a no-op.
+    """
+    path = Path(os.path.abspath(str(path)))
+    if path in _held_locks:
+        _held_locks[path] += 1
+        try:
+            yield
+        finally:
+            _held_locks[path] -= 1
+        return
+
+    lock_path = lock_path_for(path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(str(lock_path), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        deadline = time.monotonic() + timeout
+        delay = 0.005
+        while not _try_lock(fd):
+            if time.monotonic() >= deadline:
+                raise DocumentLockTimeout(f"Timed out waiting for lock on {path}")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
+        _held_locks[path] = 1
+        try:
+            yield
+        finally:
+            del _held_locks[path]
+            _unlock(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def locked_documents(paths: Iterable[Path], timeout: float = LOCK_TIMEOUT_SECONDS) -> Iterator[None]:
+    """Hold the locks of several documents, acquired in a stable order to avoid deadlocks."""
+    ordered = sorted({Path(os.path.abspath(str(path))) for path in paths})
+    with ExitStack() as stack:
+        for path in ordered:
+            stack.enter_context(document_lock(path, timeout))
+        yield
+
+
+def read_bytes_or_none(path: Path) -> Optional[bytes]:
+    """Return the current content of a document, or None if it does not exist."""
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def default_file_mode() -> int:
+    """The mode open() gives a new file under the current umask."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write a file through a temporary file, fsync and an atomic rename."""
+    fd, temp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file owner-only; give a new file the mode open() would
+        os.chmod(temp_name, path.stat().st_mode & 0o7777 if path.exists() else default_file_mode())
+        os.replace(temp_name, str(path))
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.unlink(temp_name)
+        raise
+    _fsync_directory(path.parent)
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Persist the rename itself where the platform supports it."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(str(directory), os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def commit_documents(changes: Dict[Path, Tuple[Optional[bytes], bytes]],
+                     timeout: float = LOCK_TIMEOUT_SECONDS) -> List[Path]:
+    """
+    Atomically replace several documents after checking their versions.
+
+    `changes` maps each path to (expected current bytes, new bytes); expected
+    None means the document must not exist yet. All locks are taken first and
+    every version is checked before anything is written, so a conflict leaves
+    all documents untouched. Returns the paths that were written.
+    """
+    # Documents whose edits cancelled out are left untouched and not even locked
+    changes = {path: change for path, change in changes.items() if change[0] != change[1]}
+    if not changes:
+        return []
+    with locked_documents(changes.keys(), timeout):
+        for path, (expected, _) in changes.items():
+            if read_bytes_or_none(path) != expected:
+                raise DocumentConflictError(f"{path} was modified by another process")
+        for path, (_, data) in changes.items():
+            atomic_write_bytes(path, data)
+    return list(changes)
+
+
+def materialize_bytes(path: Path, data: bytes) -> bool:
+    """
+    Make the file at `path` contain exactly `data`. The file is only written,
+    atomically, when its current bytes differ. Returns True if it was written.
+    """
+    if read_bytes_or_none(path) == data:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_bytes(path, data)
+    return True
+
+
+def materialize_text(path: Path, text: str, encoding: str = "utf-8") -> bool:
+    """Text variant of materialize_bytes(); newlines are written as given."""
+    return materialize_bytes(path, text.encode(encoding))
+
+
+class DocumentCache:
+    """
+    Read-side cache of documents shared by the steps of one kb.py invocation.
+
+    Every read is revalidated with stat(): a document is read from disk again
+    when its inode, size or modification time changed. Writes made through
+    this module replace the file and so always change the inode. Version
+    checks in commit_documents() still compare against the bytes on disk, so
+    a stale entry can at worst cause a retry, never a lost update.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Path, Tuple[Tuple[int, int, int], bytes, Optional[str]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def read_bytes(self, path: Path) -> bytes:
+        """Return the content of a document; raises FileNotFoundError like Path.read_bytes()."""
+        key = Path(os.path.abspath(str(path)))
+        stat = key.stat()
+        version = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        data = key.read_bytes()
+        self._entries[key] = (version, data, None)
+        return data
+
+    def read_text(self, path: Path) -> str:
+        """
+        UTF-8 text of a document with newlines translated like Path.read_text();
+        the decoded text is cached too.
+        """
+        data = self.read_bytes(path)
+        key = Path(os.path.abspath(str(path)))
+        version, _, text = self._entries[key]
+        if text is None:
+            text = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+            self._entries[key] = (version, data, text)
+        return text
+
+
+def retry_on_contention(operation: Callable[[], T], attempts: int = WRITE_ATTEMPTS,
+                        on_retry: Optional[Callable[[int, Exception], None]] = None) -> T:
+    """
+    Run a read-modify-write operation, re-running it from scratch when it hits
+    a version conflict or a lock timeout. The last error is re-raised.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return operation()
+        except (DocumentConflictError, DocumentLockTimeout) as e:
+            if attempt == attempts:
+                raise
+            if on_retry is not None:
+                on_retry(attempt, e)
+            # Jittered exponential backoff so that competing writers spread out
+            time.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+    raise AssertionError("unreachable")
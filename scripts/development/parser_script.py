@@ -1,5 +1,12 @@
+import argparse
+import fnmatch
+import glob
 import os
 import re
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
 # --- НАСТРОЙКИ ---
 # Имя исходного файла, который нужно обработать
@@ -15,76 +22,243 @@ EXPECTED_FILENAMES = [
     "sprint-plan.md",
     "documentation-maintenance.md",
 ]
+# Число параллельно обрабатываемых входных файлов в пакетном режиме
+MAX_WORKERS = os.cpu_count() or 1
 # --- КОНЕЦ НАСТРОЕК ---
 
+# Заголовок документа: имя файла в обратных кавычках, например `gap.md` или Gap Analysis (`gap.md`)
+HEADER_PATTERN = re.compile(r"`([a-z-]+\.md)`")
+# Открывающий блок документа в конце строки: ```markdown
+FENCE_OPEN_PATTERN = re.compile(r"```[Mm]arkdown[ \t]*$")
+# Любая строка-ограничитель блока кода: ``` или ```python
+FENCE_PATTERN = re.compile(r"^```(\S*)")
 
-def parse_raw_file():
+
+class DocumentWriter:
     """
-    Основная функция для анализа файла raw.md и создания отдельных файлов.
+    Потоково записывает содержимое одного документа во временный файл рядом
+    с целевым и атомарно переименовывает его при закрытии. Пробельные строки
+    в начале и в конце документа отбрасываются, как при str.strip(), но в
+    памяти держится только последняя непустая строка.
     """
-    print(f"--- Запуск скрипта обработки файла {INPUT_FILE} ---")
-    print(f"Текущая рабочая директория: {os.getcwd()}")
-
-    if not os.path.exists(INPUT_FILE):
-        print(f"ОШИБКА: Файл '{INPUT_FILE}' не найден в этой папке.")
-        print("Пожалуйста, убедитесь, что файл находится рядом со скриптом.")
-        return
-
-    with open(INPUT_FILE, encoding="utf-8") as f:
-        content = f.read()
-    print(f"Файл '{INPUT_FILE}' прочитан успешно. Размер содержимого: {len(content)} символов.")
-
-    pattern = re.compile(
-        r"(`([a-z-]+.md)`|([A-Z][a-zA-Z\s_`]+\(`([a-z-]+.md)`\)))"
-        r".*?"
-        r"```[Mm]arkdown\n"
-        r"(.*?)\n"
-        r"```",
-        re.DOTALL,
-    )
 
-    matches = pattern.findall(content)
-    print(f"Найдено {len(matches)} совпадений с regex.")
-
-    if not matches:
-        print(
-            "ОШИБКА: Не найдено ни одного блока документации в формате ```markdown...```."
-        )
-        return
-
-    found_count = 0
-    for i, match in enumerate(matches):
-        print(f"Обработка совпадения {i+1}: {match}")
-        filename = next(
-            (name for name in [match[1], match[3]] if name and name.endswith(".md")), None
-        )
-        print(f"Извлечённое имя файла: {filename}")
-
-        if filename and filename in EXPECTED_FILENAMES:
-            file_content = match[4].strip()
-            print(f"Содержимое файла (первые 100 символов): {file_content[:100]}...")
-
-            print(f"Найден документ: {filename}. Создание файла...")
-
-            # ФИКС: Используем имя файла напрямую, так как сохраняем в той же папке
-            full_path = filename
-            print(f"Полный путь для сохранения: {full_path}")
-
-            try:
-                with open(full_path, "w", encoding="utf-8") as f_out:
-                    f_out.write(file_content)
-                print(f"  [+] Файл '{full_path}' успешно создан.")
-                found_count += 1
-            except OSError as e:
-                print(f"  [!] ОШИБКА при записи файла '{full_path}': {e}")
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, self.temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+        self.file: TextIO = os.fdopen(fd, "w", encoding="utf-8")
+        self.held: Optional[str] = None  # Последняя непустая строка, еще не записанная
+        self.pending = ""  # Пробельные строки после нее
+
+    def write_line(self, line: str):
+        if not line.strip():
+            if self.held is not None:
+                self.pending += line
+            return
+        if self.held is None:
+            line = line.lstrip()
+        else:
+            self.file.write(self.held + self.pending)
+        self.held = line
+        self.pending = ""
+
+    def commit(self):
+        if self.held is not None:
+            self.file.write(self.held.rstrip())
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        # mkstemp создает файл с правами 0600; новый файл получает права, как у open(),
+        # а перезаписываемый сохраняет свои
+        if os.path.exists(self.path):
+            mode = os.stat(self.path).st_mode & 0o7777
         else:
-            print(f"Имя файла '{filename}' не найдено в списке ожидаемых или невалидно.")
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(self.temp_path, mode)
+        os.replace(self.temp_path, self.path)
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.temp_path):
+            os.unlink(self.temp_path)
+
+
+def extract_documents(lines: Iterable[str], output_dir: str = ".",
+                      accept: Optional[Callable[[str], bool]] = None,
+                      log: Callable[[str], None] = print) -> Iterator[str]:
+    """
+    Конечный автомат, извлекающий документы из потока строк за один проход.
+
+    Состояния: поиск заголовка -> внутри документа -> снова поиск. Заголовком
+    считается последнее имя файла `name.md`, встреченное перед строкой,
+    заканчивающейся на ```markdown. Документ продолжается до закрывающей ```
+    (вложенные блоки кода вида ```python ... ``` учитываются) и записывается
+    сразу после нее. Возвращает (yield) пути записанных файлов.
+
+    accept решает, сохранять ли документ с данным именем (None - сохранять все),
+    log получает сообщения о ходе разбора.
+    """
+    filename: Optional[str] = None
+    writer: Optional[DocumentWriter] = None
+    in_document = False
+    nested_fences = 0
+    try:
+        for line in lines:
+            if in_document:
+                fence = FENCE_PATTERN.match(line)
+                if fence and fence.group(1):
+                    nested_fences += 1
+                elif fence and nested_fences:
+                    nested_fences -= 1
+                elif fence:
+                    in_document = False
+                    if writer is not None:
+                        writer.commit()
+                        yield writer.path
+                        writer = None
+                    filename = None
+                    continue
+                if writer is not None:
+                    writer.write_line(line)
+                continue
+
+            opener = FENCE_OPEN_PATTERN.search(line.rstrip("\r\n"))
+            headers = HEADER_PATTERN.findall(line[:opener.start()] if opener else line)
+            if headers:
+                filename = headers[-1]
+            if opener and filename:
+                in_document = True
+                nested_fences = 0
+                if accept is None or accept(filename):
+                    log(f"Найден документ: {filename}. Создание файла...")
+                    writer = DocumentWriter(os.path.join(output_dir, filename))
+                else:
+                    log(f"Имя файла '{filename}' не найдено в списке ожидаемых, блок пропущен.")
+    finally:
+        # Незакрытый блок в конце входа не сохраняется
+        if writer is not None:
+            log(f"ПРЕДУПРЕЖДЕНИЕ: блок '{filename}' не закрыт до конца файла, файл не создан.")
+            writer.discard()
+
+
+def make_filename_filter(allowed: Optional[List[str]], patterns: Optional[List[str]]) -> Callable[[str], bool]:
+    """
+    Фильтр имен документов: явный список имен и/или glob-шаблоны (например,
+    "*.md"). Если не задано ни то, ни другое, используется EXPECTED_FILENAMES.
+    """
+    names = set(allowed or [])
+    if not names and not patterns:
+        names = set(EXPECTED_FILENAMES)
+    return lambda filename: filename in names or any(fnmatch.fnmatchcase(filename, p) for p in patterns or [])
+
+
+def expand_inputs(inputs: List[str]) -> Tuple[List[str], List[str]]:
+    """Раскрывает glob-шаблоны во входных путях. Возвращает (найденные файлы, пропавшие аргументы)."""
+    files: List[str] = []
+    missing: List[str] = []
+    for item in inputs:
+        matches = sorted(glob.glob(item, recursive=True)) if glob.has_magic(item) else [item]
+        matches = [m for m in matches if os.path.isfile(m)]
+        if not matches:
+            missing.append(item)
+        for match in matches:
+            if match not in files:
+                files.append(match)
+    return files, missing
+
+
+def output_dirs_for(inputs: List[str], output_dir: str) -> Dict[str, str]:
+    """
+    Одиночный вход пишется прямо в output_dir. При нескольких входах каждый
+    получает подкаталог по имени файла без расширения, чтобы одинаковые имена
+    документов из разных транскриптов не перезаписывали друг друга.
+    """
+    if len(inputs) == 1:
+        return {inputs[0]: output_dir}
+    dirs: Dict[str, str] = {}
+    used: Dict[str, int] = {}
+    for path in inputs:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        used[stem] = used.get(stem, 0) + 1
+        name = stem if used[stem] == 1 else f"{stem}-{used[stem]}"
+        dirs[path] = os.path.join(output_dir, name)
+    return dirs
+
+
+def process_input(input_path: str, output_dir: str, allowed: Optional[List[str]],
+                  patterns: Optional[List[str]]) -> Tuple[List[str], List[str], Optional[str]]:
+    """
+    Обрабатывает один входной файл (выполняется в отдельном процессе).
+    Сообщения собираются в список и печатаются родителем целиком, чтобы вывод
+    параллельных задач не перемешивался. Возвращает (созданные файлы, сообщения, ошибка).
+    """
+    messages: List[str] = []
+    created: List[str] = []
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        accept = make_filename_filter(allowed, patterns)
+        with open(input_path, encoding="utf-8") as f:
+            for path in extract_documents(f, output_dir, accept, messages.append):
+                messages.append(f"  [+] Файл '{path}' успешно создан.")
+                created.append(path)
+    except (OSError, UnicodeDecodeError) as e:
+        return created, messages, str(e)
+    return created, messages, None
+
+
+def run_batch(inputs: List[str], output_dir: str = ".", allowed: Optional[List[str]] = None,
+              patterns: Optional[List[str]] = None, workers: int = MAX_WORKERS) -> int:
+    """
+    Извлекает документы из нескольких входных файлов параллельно.
+    Возвращает код выхода: 0 - успех, 1 - ошибки или ни одного документа.
+    """
+    files, missing = expand_inputs(inputs)
+    for item in missing:
+        print(f"ОШИБКА: Файл '{item}' не найден.")
+    if not files:
+        return 1
+
+    dirs = output_dirs_for(files, output_dir)
+    total_created = 0
+    failed = len(missing)
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(files)))) as executor:
+        futures = [(path, executor.submit(process_input, path, dirs[path], allowed, patterns)) for path in files]
+        # Результаты печатаются в порядке входов, независимо от порядка завершения
+        for path, future in futures:
+            created, messages, error = future.result()
+            print(f"--- {path} ---")
+            for message in messages:
+                print(message)
+            if error:
+                print(f"ОШИБКА: Не удалось обработать '{path}': {error}")
+                failed += 1
+            elif not created:
+                print("Не найдено ни одного подходящего блока документации в формате ```markdown...```.")
+            total_created += len(created)
+
+    print(f"--- Завершено. Обработано входных файлов: {len(files)}, создано документов: {total_created}. ---")
+    return 1 if failed or not total_created else 0
+
 
-    print(
-        f"--- Завершено. Создано {found_count} из {len(EXPECTED_FILENAMES)} ожидаемых файлов. ---"
+def main():
+    parser = argparse.ArgumentParser(
+        description="Извлечение документов из транскриптов агента (блоки ```markdown с заголовком `name.md`)."
     )
+    parser.add_argument("inputs", nargs="*", default=[INPUT_FILE],
+                        help=f"Входные файлы или glob-шаблоны (по умолчанию {INPUT_FILE}).")
+    parser.add_argument("-o", "--output-dir", default=".",
+                        help="Каталог для документов. При нескольких входах - подкаталог на каждый вход.")
+    parser.add_argument("--allow", action="append", metavar="NAME",
+                        help="Имя документа, которое нужно сохранить (можно повторять).")
+    parser.add_argument("--pattern", action="append", metavar="GLOB",
+                        help="Glob-шаблон имен документов, например '*.md' (можно повторять).")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help="Число параллельно обрабатываемых входных файлов.")
+    args = parser.parse_args()
+    sys.exit(run_batch(args.inputs, args.output_dir, args.allow, args.pattern, args.workers))
 
 
 if __name__ == "__main__":
-    parse_raw_file()
-    os.system("pause")
+    main()
@@ -1,10 +1,16 @@
 # scripts/development/sync_git_kb.py
 import argparse
 import json
+import os
 import re
 import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
+
+from kb_io import DocumentCache, commit_documents, locked_documents, retry_on_contention
 
 # --- Конфигурация ---
 PAGES_DIR = "pages"
@@ -12,50 +18,89 @@ STORY_FILE_PATTERN = re.compile(r"^STORY-.*\.md$")
 STORY_ID_PATTERN = re.compile(r"STORY-([A-Z0-9\-]+)")
 STATUS_PATTERN = re.compile(r"status::\s*\[\[(DONE|TODO|DOING)\]\]", re.IGNORECASE)
 
+
+class GitCommandError(Exception):
+    """Git не удалось выполнить: это не "коммита нет", и исправлять статусы по такому результату нельзя."""
+
+
 class GitKbSync:
     """
     Скрипт для синхронизации статусов User Stories в базе знаний
     с их реальным состоянием в Git.
     """
 
-    def __init__(self, project_root: Path, report_path: Path):
+    def __init__(self, project_root: Path, report_path: Optional[Path], verbose: bool = True,
+                 documents: Optional[DocumentCache] = None):
         self.project_root = project_root
+        self.documents = documents or DocumentCache()
         self.report_path = report_path
         self.pages_path = project_root / PAGES_DIR
+        self.verbose = verbose
         self.mismatches: List[Dict[str, str]] = []
+        self.story_count = 0
+        self.files_fixed = 0
+
+    def _log(self, message: str):
+        """Печатает сообщение, если включен подробный вывод."""
+        if self.verbose:
+            print(message)
 
     def _find_story_files(self) -> List[Path]:
         """Находит все файлы User Story в директории pages/."""
         if not self.pages_path.is_dir():
-            print(f"❌ Error: Directory '{self.pages_path}' not found.")
+            self._log(f"❌ Error: Directory '{self.pages_path}' not found.")
             return []
         return [f for f in self.pages_path.glob("*.md") if STORY_FILE_PATTERN.match(f.name)]
 
     def _get_story_status(self, file_path: Path) -> Optional[str]:
         """Извлекает статус из файла User Story."""
-        content = file_path.read_text(encoding="utf-8")
+        content = self.documents.read_text(file_path)
         match = STATUS_PATTERN.search(content)
         return match.group(1).upper() if match else None
 
+    def check_git_repository(self):
+        """Проверяет, что корень проекта - рабочий Git-репозиторий; иначе выбрасывает GitCommandError."""
+        try:
+            subprocess.run(
+                ["git", "rev-parse", "--git-dir"],
+                cwd=self.project_root,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        except subprocess.CalledProcessError as e:
+            raise GitCommandError(f"'{self.project_root}' is not a Git repository: {e.stderr.strip()}")
+        except (FileNotFoundError, NotADirectoryError) as e:
+            raise GitCommandError(f"Cannot run git in '{self.project_root}': {e}")
+
     def _check_git_commit_exists(self, story_id: str) -> bool:
-        """Проверяет, существует ли коммит с ID задачи."""
+        """
+        Проверяет, существует ли коммит с ID задачи. ID должен совпадать целиком:
+        коммит для STORY-API-10 не закрывает STORY-API-1. Если git завершился
+        с ошибкой, выбрасывает GitCommandError.
+        """
         try:
-            # Ищем коммит, в сообщении которого есть ID задачи (например, "feat: ... (STORY-API-1)")
+            # Быстрый отбор по подстроке, затем точная проверка границ ID
             result = subprocess.run(
-                ["git", "log", "--grep", story_id, "--oneline"],
+                ["git", "log", "-F", "--grep", story_id, "--format=%B"],
                 cwd=self.project_root,
                 capture_output=True,
                 text=True,
                 check=True,
             )
-            return bool(result.stdout.strip())
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+        except subprocess.CalledProcessError as e:
+            raise GitCommandError(f"git log failed in '{self.project_root}': {e.stderr.strip()}")
+        except FileNotFoundError as e:
+            raise GitCommandError(f"git is not available: {e}")
+        exact_id = re.compile(rf"(?<![A-Z0-9-]){re.escape(story_id)}(?![A-Z0-9-])")
+        return bool(exact_id.search(result.stdout))
 
     def run_sync(self):
         """Основной метод для запуска процесса синхронизации."""
+        self.check_git_repository()
         story_files = self._find_story_files()
-        print(f"ℹ️  Found {len(story_files)} User Story files to analyze.")
+        self.story_count = len(story_files)
+        self._log(f"ℹ️  Found {len(story_files)} User Story files to analyze.")
 
         for story_file in story_files:
             story_id_match = STORY_ID_PATTERN.search(story_file.stem)
@@ -66,7 +111,7 @@ class GitKbSync:
             status = self._get_story_status(story_file)
             
             if not status:
-                print(f"⚠️  Warning: Could not find status for '{story_file.name}'. Skipping.")
+                self._log(f"⚠️  Warning: Could not find status for '{story_file.name}'. Skipping.")
                 continue
 
             commit_exists = self._check_git_commit_exists(story_id)
@@ -77,7 +122,8 @@ class GitKbSync:
                     "file_path": str(story_file.relative_to(self.project_root)),
                     "story_id": story_id,
                     "issue": "Status is DONE, but no corresponding Git commit was found.",
-                    "recommended_action": "Change status to [[TODO]] or investigate."
+                    "recommended_action": "Change status to [[TODO]] or investigate.",
+                    "expected_status": "TODO",
                 })
 
             elif status in ["TODO", "DOING"] and commit_exists:
@@ -85,10 +131,47 @@ class GitKbSync:
                     "file_path": str(story_file.relative_to(self.project_root)),
                     "story_id": story_id,
                     "issue": f"Status is {status}, but a closing Git commit already exists.",
-                    "recommended_action": "Change status to [[DONE]]."
+                    "recommended_action": "Change status to [[DONE]].",
+                    "expected_status": "DONE",
                 })
         
-        print(f"✅ Analysis complete. Found {len(self.mismatches)} mismatches.")
+        self._log(f"✅ Analysis complete. Found {len(self.mismatches)} mismatches.")
+
+    def apply_fixes(self) -> int:
+        """
+        Исправляет свойство status:: во всех файлах с расхождениями одним пакетом.
+        Файлы блокируются, новое содержимое вычисляется для всех файлов сразу, затем
+        каждый измененный файл записывается атомарно. При конкурентном изменении
+        цикл повторяется. Возвращает количество перезаписанных файлов.
+        """
+        self.files_fixed = retry_on_contention(self._apply_fixes_once)
+        self._log(f"✅ Applied fixes. Files touched: {self.files_fixed}.")
+        return self.files_fixed
+
+    def _apply_fixes_once(self) -> int:
+        """Один цикл чтения-изменения-записи под блокировками документов."""
+        paths = [self.project_root / mismatch["file_path"] for mismatch in self.mismatches]
+        with locked_documents(paths):
+            return self._write_fixes()
+
+    def _write_fixes(self) -> int:
+        pending: Dict[Path, Tuple[bytes, bytes]] = {}
+        for mismatch in self.mismatches:
+            file_path = self.project_root / mismatch["file_path"]
+            original = file_path.read_bytes()
+            content = original.decode("utf-8")
+            match = STATUS_PATTERN.search(content)
+            if not match:
+                continue
+            # Заменяем только значение статуса, сохраняя остальной файл байт в байт
+            updated = content[:match.start(1)] + mismatch["expected_status"] + content[match.end(1):]
+            data = updated.encode("utf-8")
+            if data != original:
+                pending[file_path] = (original, data)
+
+        for file_path in commit_documents(pending):
+            self._log(f"🔧 Fixed status in '{file_path.relative_to(self.project_root)}'.")
+        return len(pending)
 
     def write_report(self):
         """Записывает найденные расхождения в JSON-отчет."""
@@ -97,15 +180,169 @@ class GitKbSync:
         print(f"📝 Report successfully generated at '{self.report_path}'.")
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Synchronize User Story statuses between Logseq Knowledge Base and Git commits."
-    )
+def audit_repository(project_root: str, apply: bool = False) -> Dict[str, Any]:
+    """
+    Проверяет один репозиторий и возвращает запись для JSON-lines отчета.
+    Выполняется в отдельном процессе пула, поэтому принимает и возвращает
+    только сериализуемые значения.
+    """
+    started = time.perf_counter()
+    syncer = GitKbSync(project_root=Path(project_root), report_path=None, verbose=False)
+    error = None
+    if not syncer.pages_path.is_dir():
+        error = f"Directory '{syncer.pages_path}' not found."
+    else:
+        try:
+            syncer.check_git_repository()
+        except GitCommandError as e:
+            error = str(e)
+    if error is None:
+        try:
+            syncer.run_sync()
+            if apply:
+                syncer.apply_fixes()
+        except Exception as e:
+            error = str(e)
+    return {
+        "project_root": project_root,
+        "story_count": syncer.story_count,
+        "mismatch_count": len(syncer.mismatches),
+        "mismatches": syncer.mismatches,
+        "files_fixed": syncer.files_fixed,
+        "error": error,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def load_repos_file(repos_file: Path) -> List[str]:
+    """Читает список корней проектов: по одному пути на строку, '#' - комментарий."""
+    repos = []
+    for line in repos_file.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            repos.append(line)
+    return repos
+
+
+def run_multi_repo_audit(repos: List[str], report_path: Path, max_workers: int,
+                         apply: bool = False) -> Tuple[int, int]:
+    """
+    Проверяет несколько репозиториев параллельно на ограниченном пуле процессов.
+    Каждый результат сразу дописывается в JSON-lines отчет. Возвращает общее
+    число найденных расхождений и число репозиториев с ошибкой.
+    """
+    # Убираем дубликаты, сохраняя порядок
+    repos = list(dict.fromkeys(str(Path(repo).resolve()) for repo in repos))
+    workers = max(1, min(max_workers, len(repos)))
+    print(f"ℹ️  Auditing {len(repos)} repositories with {workers} workers.")
+
+    started = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    with open(report_path, "w", encoding="utf-8") as report, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(audit_repository, repo, apply): repo for repo in repos}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {
+                    "project_root": futures[future],
+                    "story_count": 0,
+                    "mismatch_count": 0,
+                    "mismatches": [],
+                    "files_fixed": 0,
+                    "error": str(e),
+                    "elapsed_seconds": 0.0,
+                }
+            report.write(json.dumps(result, ensure_ascii=False) + "\n")
+            report.flush()
+            results.append(result)
+
+            if result["error"]:
+                print(f"❌ {result['project_root']}: {result['error']}")
+            else:
+                print(f"✅ {result['project_root']}: {result['story_count']} stories, "
+                      f"{result['mismatch_count']} mismatches ({result['elapsed_seconds']:.2f}s)")
+
+    wall_time = time.perf_counter() - started
+    total_mismatches = sum(r["mismatch_count"] for r in results)
+    failed = [r for r in results if r["error"]]
+    busy_time = sum(r["elapsed_seconds"] for r in results)
+
+    print("\n📊 Audit Summary:")
+    print(f"   Repositories audited: {len(results)}")
+    print(f"   Stories analyzed: {sum(r['story_count'] for r in results)}")
+    print(f"   Mismatches found: {total_mismatches}")
+    if apply:
+        print(f"   Files fixed: {sum(r['files_fixed'] for r in results)}")
+    if failed:
+        print(f"   ❌ Failed repositories: {len(failed)}")
+    print(f"   Wall time: {wall_time:.2f}s (sum of per-repository time: {busy_time:.2f}s)")
+    if results:
+        slowest = max(results, key=lambda r: r["elapsed_seconds"])
+        print(f"   Slowest repository: {slowest['project_root']} ({slowest['elapsed_seconds']:.2f}s)")
+    print(f"📝 Report successfully generated at '{report_path}'.")
+    return total_mismatches, len(failed)
+
+
+def add_step_arguments(parser):
+    """Аргументы синхронизации; используются и main(), и шагом sync-git в kb.py."""
     parser.add_argument(
         "--report-path",
         type=Path,
         required=True,
-        help="The path to save the JSON report file.",
+        help="The path to save the JSON report file (JSON lines in multi-repository mode).",
+    )
+    parser.add_argument(
+        "--repos",
+        action="append",
+        metavar="PATH",
+        help="Audit this project root; repeat the option to audit several roots concurrently "
+             "instead of --project-root.",
+    )
+    parser.add_argument(
+        "--repos-file",
+        type=Path,
+        help="File with one project root per line to audit concurrently.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Maximum number of worker processes in multi-repository mode.",
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Rewrite the status:: property of every mismatched story in one batch.",
+    )
+
+
+def run_step(args: argparse.Namespace, documents: Optional[DocumentCache] = None) -> int:
+    """Запускает синхронизацию как шаг kb.py. Возвращает код выхода."""
+    if args.repos or args.repos_file:
+        repos = list(args.repos or [])
+        if args.repos_file:
+            repos.extend(load_repos_file(args.repos_file))
+        _, failed = run_multi_repo_audit(repos, args.report_path, args.workers, apply=args.apply)
+        return 1 if failed else 0
+
+    syncer = GitKbSync(project_root=args.project_root, report_path=args.report_path, documents=documents)
+    try:
+        syncer.run_sync()
+    except GitCommandError as e:
+        # Без надежного ответа git расхождения неизвестны, поэтому ничего не исправляем
+        print(f"❌ Error: {e}. No statuses were changed.")
+        return 1
+    if args.apply:
+        syncer.apply_fixes()
+    syncer.write_report()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Synchronize User Story statuses between Logseq Knowledge Base and Git commits."
     )
     parser.add_argument(
         "--project-root",
@@ -113,11 +350,8 @@ def main():
         default=Path.cwd(),
         help="The root directory of the project.",
     )
-    args = parser.parse_args()
-
-    syncer = GitKbSync(project_root=args.project_root, report_path=args.report_path)
-    syncer.run_sync()
-    syncer.write_report()
+    add_step_arguments(parser)
+    sys.exit(run_step(parser.parse_args()))
 
 
 if __name__ == "__main__":
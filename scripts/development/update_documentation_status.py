@@ -9,15 +9,27 @@ across sprint plans, backlogs, and requirements based on task completion.
 Features:
 - Extract task IDs from commit messages using regex patterns
 - Update task status in sprint-plan.md from In Progress/TODO to Done
+- Support per-sprint plan shards (sprint-plan.S12.md); only the shard holding
+  a task is rewritten, and consistency checks cover all shards
 - Automatically update story status in backlog.md when all related tasks are done
 - Update requirement status in requirements.md based on story completion
+- Roll statuses up an explicit TASK -> STORY -> REQ dependency graph, or
+  rebuild all of them in one pass with --recompute-all
 - Run consistency checks to ensure documentation integrity
+- Parse each document's tables once into an indexed in-memory model and write
+  every modified document back once, changing only the edited cells
 - Support for both commit message and direct task ID input
+- Batch mode for a whole commit range or messages on stdin, writing each
+  document at most once
+- Concurrency-safe writes: per-document locks, version checks, atomic
+  replace and retries when parallel invocations collide
 - Comprehensive error handling and logging
 
 Usage:
     python scripts/development/update_documentation_status.py --commit-message "Closes TASK-S1-1"
     python scripts/development/update_documentation_status.py --task-id TASK-S1-1
+    python scripts/development/update_documentation_status.py --commit-range ORIG_HEAD..HEAD
+    python scripts/development/update_documentation_status.py --recompute-all
     python scripts/development/update_documentation_status.py --check-only
 
 Integration:
@@ -25,10 +37,21 @@ Integration:
     to automatically maintain documentation consistency.
 """
 
+import argparse
 import re
+import subprocess
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from kb_io import (
+    DocumentCache,
+    DocumentConflictError,
+    DocumentLockTimeout,
+    commit_documents,
+    locked_documents,
+    retry_on_contention,
+)
 
 # Add project root to path
 project_root = Path(__file__).parent.parent.parent
@@ -50,14 +73,462 @@ def log_warning(message: str) -> None:
     print(f"⚠️  {message}", file=sys.stderr)
 
 
+# Per-sprint plan pages, e.g. sprint-plan.S12.md, next to or instead of sprint-plan.md
+SPRINT_PLAN_SHARD_GLOB = "sprint-plan.*.md"
+# Cells that identify a table row, optionally wrapped in a [[page link]]
+ID_CELL_PATTERN = re.compile(r'^(?:\[\[)?((?:TASK|STORY|REQ|EPIC)-[A-Z0-9-]+)(?:\]\])?$')
+SEPARATOR_CELL_PATTERN = re.compile(r'^:?-+:?$')
+# ID kinds in order of precedence: a row is keyed by its most specific ID, so a
+# backlog row "| EPIC-API | STORY-API-1 | REQ-API-1 |" is the story, not the epic
+ID_PREFIX_PRECEDENCE = ("TASK-", "STORY-", "REQ-", "EPIC-")
+# Header cells (lowercased, letters only) that name the ID column of each kind
+ID_HEADER_PREFIXES = {"taskid": "TASK-", "storyid": "STORY-", "reqid": "REQ-", "requirementid": "REQ-"}
+CELL_DELIMITER_PATTERN = re.compile(r'(?<!\\)\|')
+# Known status values, used to locate the status cell in tables without a Status header
+STATUS_VALUES = {"TODO", "In Progress", "Done", "PLANNED", "PARTIAL", "IMPLEMENTED"}
+
+
+def split_table_cells(line: str) -> Optional[List[Tuple[int, int]]]:
+    """Return (start, end) offsets of each trimmed cell of a markdown table line."""
+    body = line.rstrip('\r\n')
+    if not body.lstrip().startswith('|'):
+        return None
+    pipes = [match.start() for match in CELL_DELIMITER_PATTERN.finditer(body)]
+    bounds = list(zip(pipes, pipes[1:]))
+    if body[pipes[-1] + 1:].strip():
+        bounds.append((pipes[-1], len(body)))
+    if not bounds:
+        return None
+
+    spans = []
+    for left, right in bounds:
+        start, end = left + 1, right
+        while start < end and body[start].isspace():
+            start += 1
+        while end > start and body[end - 1].isspace():
+            end -= 1
+        spans.append((start, end))
+    return spans
+
+
+# IDs collected by the consistency checks, one capture group per kind
+ID_EXTRACTION_PATTERN = re.compile(r'(REQ-[A-Z]+-\d+)|(STORY-[A-Z]+-\d+)|(EPIC-[A-Z]+)')
+
+
+class TableRow:
+    """A single data row of a markdown table, addressed by its ID cell."""
+
+    def __init__(self, line_index: int, cells: List[str], row_id: str,
+                 id_column: int, status_column: Optional[int]):
+        self.line_index = line_index
+        self.cells = cells
+        self.row_id = row_id
+        self.id_column = id_column
+        self.status_column = status_column
+
+    @property
+    def status(self) -> Optional[str]:
+        if self.status_column is None:
+            return None
+        return self.cells[self.status_column]
+
+
+class DocumentIndex:
+    """ID sets and per-row statuses of one document, extracted in a single pass."""
+
+    def __init__(self, document: "MarkdownTableDocument"):
+        self.requirement_ids: Set[str] = set()
+        self.story_ids: Set[str] = set()
+        self.epic_ids: Set[str] = set()
+        for req_id, story_id, epic_id in ID_EXTRACTION_PATTERN.findall(document.text):
+            if req_id:
+                self.requirement_ids.add(req_id)
+            elif story_id:
+                self.story_ids.add(story_id)
+            else:
+                self.epic_ids.add(epic_id)
+        self.statuses: Dict[str, Optional[str]] = {
+            row_id: rows[0].status for row_id, rows in document.rows.items()
+        }
+
+
+class MarkdownTableDocument:
+    """
+    Indexed, in-memory model of the markdown tables in one document.
+
+    The document is parsed once into rows keyed by ID. Cell updates are applied
+    to the in-memory lines, and the file is written back once, unchanged apart
+    from the edited cells. The bytes read from disk are kept as the version
+    that the write is checked against.
+    """
+
+    def __init__(self, path: Path, text: str):
+        self.path = path
+        self.original = text.encode('utf-8')
+        self.lines = text.splitlines(keepends=True)
+        self.rows: Dict[str, List[TableRow]] = {}
+        self.dirty = False
+        self._index: Optional[DocumentIndex] = None
+        self._parse()
+
+    @classmethod
+    def load(cls, path: Path) -> "MarkdownTableDocument":
+        # Decode raw bytes so that line endings survive the round trip
+        return cls(path, path.read_bytes().decode('utf-8'))
+
+    @property
+    def text(self) -> str:
+        return ''.join(self.lines)
+
+    @property
+    def index(self) -> DocumentIndex:
+        if self._index is None:
+            self._index = DocumentIndex(self)
+        return self._index
+
+    def _parse(self) -> None:
+        header: List[str] = []
+        previous_cells: Optional[List[str]] = None
+        for index, line in enumerate(self.lines):
+            spans = split_table_cells(line)
+            if spans is None:
+                header, previous_cells = [], None
+                continue
+
+            cells = [line[start:end] for start, end in spans]
+            if previous_cells is not None and all(SEPARATOR_CELL_PATTERN.match(cell) for cell in cells):
+                header = [re.sub(r'[*_`]', '', cell).strip().lower() for cell in previous_cells]
+                previous_cells = cells
+                continue
+            previous_cells = cells
+
+            id_column = self._find_id_column(header, cells)
+            if id_column is None:
+                continue
+            row_id = ID_CELL_PATTERN.match(cells[id_column]).group(1)
+
+            status_column = header.index('status') if 'status' in header else None
+            if status_column is None or status_column >= len(cells):
+                status_column = next(
+                    (i for i in range(id_column + 1, len(cells)) if cells[i] in STATUS_VALUES), None
+                )
+            row = TableRow(index, cells, row_id, id_column, status_column)
+            self.rows.setdefault(row_id, []).append(row)
+
+    @staticmethod
+    def _find_id_column(header: List[str], cells: List[str]) -> Optional[int]:
+        """
+        Return the column holding the row's own ID. Columns named in the header
+        ("Task ID", "Story ID", "Req. ID") win; otherwise the ID cell with the
+        most specific prefix is used. Either way TASK beats STORY beats REQ.
+        """
+        candidates = {}
+        for column, cell in enumerate(cells):
+            match = ID_CELL_PATTERN.match(cell)
+            if not match:
+                continue
+            named = ID_HEADER_PREFIXES.get(re.sub(r'[^a-z]', '', header[column])) if column < len(header) else None
+            prefix = next(p for p in ID_PREFIX_PRECEDENCE if match.group(1).startswith(p))
+            # Header-named columns rank ahead of every unnamed one
+            rank = (0 if named == prefix else 1, ID_PREFIX_PRECEDENCE.index(prefix))
+            candidates.setdefault(rank, column)
+        return candidates[min(candidates)] if candidates else None
+
+    def all_rows(self) -> Iterable[TableRow]:
+        for rows in self.rows.values():
+            yield from rows
+
+    def set_cell(self, row: TableRow, column: int, value: str) -> None:
+        line = self.lines[row.line_index]
+        start, end = split_table_cells(line)[column]
+        self.lines[row.line_index] = line[:start] + value + line[end:]
+        row.cells[column] = value
+        self.dirty = True
+        self._index = None
+
+    def set_status(self, row_id: str, new_status: str,
+                   from_statuses: Optional[Iterable[str]] = None) -> bool:
+        """Set the status of every row with this ID; returns True if any cell changed."""
+        allowed = set(from_statuses) if from_statuses is not None else None
+        changed = False
+        for row in self.rows.get(row_id, []):
+            current = row.status
+            if current is None or current == new_status:
+                continue
+            if allowed is not None and current not in allowed:
+                continue
+            self.set_cell(row, row.status_column, new_status)
+            changed = True
+        return changed
+
+    def mark_saved(self, data: bytes) -> None:
+        self.original = data
+        self.dirty = False
+
+
+# Upward edges of the status graph: (child prefix, parent prefix)
+PARENT_PREFIXES = {"TASK-": "STORY-", "STORY-": "REQ-"}
+# References to a parent ID inside the other cells of a row
+PARENT_ID_PATTERNS = {
+    prefix: re.compile(rf'(?<![A-Z0-9-]){prefix}[A-Z0-9]+(?:-[A-Z0-9]+)*')
+    for prefix in PARENT_PREFIXES.values()
+}
+# Statuses that count as "done" for each kind of node
+DONE_STATUSES = {"TASK-": "Done", "STORY-": "Done", "REQ-": "IMPLEMENTED"}
+# Statuses derived by --recompute-all: (none done, some done or in progress, all done).
+# Cells holding any other value are left alone
+DERIVED_STATUSES = {
+    "STORY-": ("TODO", "In Progress", "Done"),
+    "REQ-": ("PLANNED", "PARTIAL", "IMPLEMENTED"),
+}
+
+
+class StatusNode:
+    """A task, story or requirement together with its rollup counters."""
+
+    __slots__ = ("node_id", "prefix", "status", "document", "parents", "children", "done_children")
+
+    def __init__(self, node_id: str, prefix: str, status: Optional[str], document: "MarkdownTableDocument"):
+        self.node_id = node_id
+        self.prefix = prefix
+        self.status = status
+        self.document = document
+        self.parents: List["StatusNode"] = []
+        self.children: List["StatusNode"] = []
+        self.done_children = 0
+
+    @property
+    def is_done(self) -> bool:
+        return self.status == DONE_STATUSES[self.prefix]
+
+
+class StatusGraph:
+    """
+    Dependency graph of TASK -> STORY -> REQ built from the parsed documents.
+
+    Parents are taken from explicit references in a row (the Story ID column of
+    the sprint plan, the Req. ID column of the backlog). Rows without one fall
+    back to the naming convention TASK-X -> STORY-X -> REQ-X, dropping trailing
+    ID segments until an existing parent is found. Every parent keeps a counter
+    of its done children, so a status change propagates upward in O(depth).
+
+    Each node remembers the document (or sprint plan shard) holding its row,
+    so a status change only marks that one document as modified.
+    """
+
+    def __init__(self, documents: Dict[str, List[MarkdownTableDocument]]):
+        self.documents = documents
+        self.nodes: Dict[str, StatusNode] = {}
+        self._rows: Dict[str, TableRow] = {}
+        self._build()
+
+    def _build(self) -> None:
+        for prefix, documents in self.documents.items():
+            for document in documents:
+                for row in document.all_rows():
+                    if row.row_id.startswith(prefix) and row.row_id not in self.nodes:
+                        self.nodes[row.row_id] = StatusNode(row.row_id, prefix, row.status, document)
+                        self._rows[row.row_id] = row
+
+        for node in list(self.nodes.values()):
+            parent_prefix = PARENT_PREFIXES.get(node.prefix)
+            if parent_prefix is None:
+                continue
+            for parent_id in self._find_parent_ids(node, parent_prefix):
+                parent = self.nodes[parent_id]
+                node.parents.append(parent)
+                parent.children.append(node)
+                if node.is_done:
+                    parent.done_children += 1
+
+    def _find_parent_ids(self, node: StatusNode, parent_prefix: str) -> List[str]:
+        row = self._rows[node.node_id]
+        id_pattern = PARENT_ID_PATTERNS[parent_prefix]
+        explicit = []
+        for column, cell in enumerate(row.cells):
+            if column != row.id_column:
+                explicit.extend(found for found in id_pattern.findall(cell) if found in self.nodes)
+        if explicit:
+            return list(dict.fromkeys(explicit))
+
+        # Naming convention: TASK-S1-1-2 -> STORY-S1-1-2 -> STORY-S1-1 -> ...
+        candidate = parent_prefix + node.node_id[len(node.prefix):]
+        while candidate != parent_prefix.rstrip('-'):
+            if candidate in self.nodes:
+                return [candidate]
+            candidate = candidate.rsplit('-', 1)[0]
+        return []
+
+    def parents_of(self, node_id: str) -> List[str]:
+        node = self.nodes.get(node_id)
+        return [parent.node_id for parent in node.parents] if node else []
+
+    def children_of(self, node_id: str) -> List[str]:
+        node = self.nodes.get(node_id)
+        return [child.node_id for child in node.children] if node else []
+
+    def set_status(self, node_id: str, new_status: str) -> bool:
+        """Change a node's status in the graph and its document, keeping parent counters in sync."""
+        node = self.nodes[node_id]
+        if node.status == new_status:
+            return False
+        was_done = node.is_done
+        node.status = new_status
+        node.document.set_status(node_id, new_status)
+        if node.is_done != was_done:
+            for parent in node.parents:
+                parent.done_children += 1 if node.is_done else -1
+        return True
+
+    def rollup_story(self, story_id: str) -> Optional[str]:
+        """Mark the story Done when all of its tasks are Done; returns the new status if changed."""
+        story = self.nodes[story_id]
+        if not story.children or story.done_children < len(story.children):
+            return None
+        if story.status not in ("In Progress", "TODO"):
+            return None
+        self.set_status(story_id, "Done")
+        return "Done"
+
+    def rollup_requirement(self, req_id: str) -> Optional[str]:
+        """Set the requirement to IMPLEMENTED or PARTIAL from its story counters; returns the new status if changed."""
+        requirement = self.nodes[req_id]
+        if requirement.done_children == 0:
+            return None
+        new_status = "IMPLEMENTED" if requirement.done_children == len(requirement.children) else "PARTIAL"
+        if requirement.status not in ("PLANNED", "PARTIAL", "IMPLEMENTED"):
+            return None
+        if not self.set_status(req_id, new_status):
+            return None
+        return new_status
+
+    def derived_status(self, node_id: str) -> Optional[str]:
+        """
+        Status a story or requirement should have given its children: all done,
+        some done (or, for stories, a task in progress), or none done. Nodes
+        without children have nothing to derive from and return None.
+        """
+        node = self.nodes[node_id]
+        if node.prefix not in DERIVED_STATUSES or not node.children:
+            return None
+        none_done, partial, all_done = DERIVED_STATUSES[node.prefix]
+        if node.done_children == len(node.children):
+            return all_done
+        if node.done_children:
+            return partial
+        if node.prefix == "STORY-" and any(child.status == "In Progress" for child in node.children):
+            return partial
+        return none_done
+
+    def recompute_all(self) -> List[Tuple[str, str]]:
+        """
+        Rebuild every story and requirement status from its children in one
+        linear pass, moving statuses down as well as up.
+        """
+        changes = []
+        # Stories first, so requirement counters already reflect the new story statuses
+        for prefix in ("STORY-", "REQ-"):
+            for node in self.nodes.values():
+                if node.prefix != prefix or node.status not in DERIVED_STATUSES[prefix]:
+                    continue
+                new_status = self.derived_status(node.node_id)
+                if new_status and self.set_status(node.node_id, new_status):
+                    changes.append((node.node_id, new_status))
+        return changes
+
+
 class DocumentationUpdater:
     """Handles automated documentation status updates and consistency checks."""
     
-    def __init__(self, pages_dir: str = "pages"):
+    def __init__(self, pages_dir: str = "pages", cache: Optional[DocumentCache] = None):
         self.pages_dir = Path(pages_dir)
+        # Shared with the other kb.py steps; every read is revalidated against the file on disk
+        self.cache = cache or DocumentCache()
         self.errors: List[str] = []
         self.warnings: List[str] = []
+        self.documents: Dict[str, Optional[MarkdownTableDocument]] = {}
+        self.status_graph: Optional[StatusGraph] = None
+
+    def get_document(self, filename: str) -> Optional[MarkdownTableDocument]:
+        """Return the parsed document, reading it from disk only on first use."""
+        if filename not in self.documents:
+            path = self.pages_dir / filename
+            self.documents[filename] = (
+                MarkdownTableDocument(path, self.cache.read_bytes(path).decode('utf-8')) if path.exists() else None
+            )
+        return self.documents[filename]
+
+    def document_paths(self) -> List[Path]:
+        """Paths of every document the status updates may read or write."""
+        paths = [self.pages_dir / name for name in ("sprint-plan.md", "backlog.md", "requirements.md")]
+        paths.extend(sorted(self.pages_dir.glob(SPRINT_PLAN_SHARD_GLOB)))
+        return paths
+
+    def get_sprint_plans(self) -> List[MarkdownTableDocument]:
+        """
+        Return every sprint plan shard: the single sprint-plan.md and/or
+        per-sprint pages such as sprint-plan.S12.md.
+        """
+        filenames = [path.name for path in sorted(self.pages_dir.glob(SPRINT_PLAN_SHARD_GLOB))]
+        if (self.pages_dir / "sprint-plan.md").exists():
+            filenames.insert(0, "sprint-plan.md")
+        return [self.get_document(filename) for filename in filenames]
+
+    def get_status_graph(self) -> StatusGraph:
+        """Return the TASK -> STORY -> REQ graph, building it on first use."""
+        if self.status_graph is None:
+            documents = {
+                "TASK-": self.get_sprint_plans(),
+                "STORY-": [self.get_document("backlog.md")],
+                "REQ-": [self.get_document("requirements.md")],
+            }
+            self.status_graph = StatusGraph({
+                prefix: [document for document in docs if document is not None]
+                for prefix, docs in documents.items()
+            })
+        return self.status_graph
+
+    def save_documents(self) -> List[Path]:
+        """
+        Write every modified document back to disk exactly once, skipping
+        documents whose content ends up unchanged.
+
+        All modified documents are locked together and replaced atomically, and
+        only if none of them changed on disk since it was read; otherwise
+        DocumentConflictError is raised and nothing is written.
+        """
+        dirty = [document for document in self.documents.values() if document is not None and document.dirty]
+        if not dirty:
+            return []
+        changes = {document.path: (document.original, document.text.encode('utf-8')) for document in dirty}
+        written = commit_documents(changes)
+        for document in dirty:
+            document.mark_saved(changes[document.path][1])
+        for path in written:
+            log_info(f"Saved {path}")
+        return written
         
+    def run_updates(self, task_ids: List[str], recompute_all: bool = False, batch: bool = False) -> bool:
+        """
+        Apply the requested updates and write the results once, holding the
+        document locks for the whole read-modify-write cycle.
+        """
+        with locked_documents(self.document_paths()):
+            if recompute_all:
+                success = bool(self.get_sprint_plans())
+                self.recompute_all_statuses()
+            elif batch:
+                # Tasks that are already Done (e.g. replayed commits) are reported, not treated as errors
+                updated = [task_id for task_id in task_ids if self.process_task(task_id)]
+                log_info(f"Updated {len(updated)} of {len(task_ids)} tasks")
+                success = True
+            else:
+                success = all([self.process_task(task_id) for task_id in task_ids])
+
+            # Write every modified document back once
+            self.save_documents()
+        return success
+
     def extract_task_id_from_commit(self, commit_message: str) -> Optional[str]:
         """Extract task ID from commit message using regex pattern."""
         pattern = r'Closes\s+(TASK-[A-Z0-9-]+)'
@@ -68,28 +539,50 @@ class DocumentationUpdater:
             return task_id
         log_warning(f"No task ID found in commit message: {commit_message}")
         return None
+
+    def extract_task_ids_from_text(self, text: str) -> List[str]:
+        """Extract every closed task ID from a batch of commit messages, in order and without duplicates."""
+        matches = re.findall(r'Closes\s+(TASK-[A-Z0-9-]+)', text, re.IGNORECASE)
+        task_ids = list(dict.fromkeys(match.upper() for match in matches))
+        log_info(f"Extracted {len(task_ids)} task IDs from commit messages")
+        return task_ids
+
+    def process_task(self, task_id: str) -> bool:
+        """Apply the task -> story -> requirement update protocol for one task in memory."""
+        log_info(f"Processing task: {task_id}")
+
+        # Step 1: Update sprint plan
+        if not self.update_sprint_plan(task_id):
+            return False
+
+        # Step 2: Update backlog from task
+        if not self.update_backlog_from_task(task_id):
+            log_warning("Backlog update failed, continuing with consistency checks")
+
+        # Step 3: Update requirements from story
+        for story_id in self.get_status_graph().parents_of(task_id):
+            if not self.update_requirements_from_story(story_id):
+                log_warning("Requirements update failed, continuing with consistency checks")
+
+        return True
     
     def update_sprint_plan(self, task_id: str) -> bool:
         """Update task status in sprint plan from In Progress/TODO to Done."""
-        sprint_file = self.pages_dir / "sprint-plan.md"
-        if not sprint_file.exists():
-            log_error(f"Sprint plan file not found: {sprint_file}")
+        if not self.get_sprint_plans():
+            log_error(f"Sprint plan file not found: {self.pages_dir / 'sprint-plan.md'}")
             return False
             
+        graph = self.get_status_graph()
+
         try:
-            content = sprint_file.read_text(encoding='utf-8')
-            
-            # Find and update task status - handle both In Progress and TODO statuses
-            pattern = rf'(\|\s*{re.escape(task_id)}\s*\|.*?\|\s*)(In Progress|TODO)(\s*\|)'
-            replacement = r'\1Done\3'
-            
-            if not re.search(pattern, content):
+            # Handle both In Progress and TODO statuses
+            task = graph.nodes.get(task_id)
+            if task is None or task.status not in ("In Progress", "TODO"):
                 log_warning(f"Task {task_id} not found or already marked as Done")
                 return False
                 
-            updated_content = re.sub(pattern, replacement, content)
-            sprint_file.write_text(updated_content, encoding='utf-8')
-            log_info(f"Updated task {task_id} status to Done in sprint plan")
+            graph.set_status(task_id, "Done")
+            log_info(f"Updated task {task_id} status to Done in {task.document.path.name}")
             return True
             
         except Exception as e:
@@ -99,59 +592,31 @@ class DocumentationUpdater:
     def update_backlog_from_task(self, task_id: str) -> bool:
         """Update story status in backlog when all related tasks are completed."""
         try:
-            # Extract story ID from the task (TASK-S1-1 -> STORY-S1-1)
-            story_id = task_id.replace("TASK-", "STORY-", 1)
-            log_info(f"Checking story {story_id} completion status")
-            
-            # Read sprint plan to check if all tasks for this story are done
-            sprint_file = self.pages_dir / "sprint-plan.md"
-            if not sprint_file.exists():
+            if not self.get_sprint_plans():
                 log_error("Sprint plan file not found")
                 return False
-                
-            sprint_content = sprint_file.read_text(encoding='utf-8')
-            
-            # Find all tasks for this story
-            story_tasks = []
-            for line in sprint_content.split('\n'):
-                if story_id.replace("STORY-", "TASK-") in line:
-                    story_tasks.append(line)
-            
-            if not story_tasks:
-                log_warning(f"No tasks found for story {story_id}")
-                return False
-            
-            # Check if all tasks are done
-            all_done = True
-            for task_line in story_tasks:
-                if "| Done |" not in task_line and "| In Progress |" in task_line or "| TODO |" in task_line:
-                    all_done = False
-                    break
-            
-            if not all_done:
-                log_info(f"Story {story_id} has incomplete tasks, skipping backlog update")
-                return False
-            
-            # Update backlog if all tasks are done
-            backlog_file = self.pages_dir / "backlog.md"
-            if not backlog_file.exists():
+            if self.get_document("backlog.md") is None:
                 log_error("Backlog file not found")
                 return False
-                
-            backlog_content = backlog_file.read_text(encoding='utf-8')
             
-            # Update story status to Done
-            pattern = rf'(\|\s*{re.escape(story_id)}\s*\|.*?\|\s*)(In Progress|TODO)(\s*\|)'
-            replacement = r'\1Done\3'
-            
-            if not re.search(pattern, backlog_content):
-                log_warning(f"Story {story_id} not found or already marked as Done in backlog")
+            graph = self.get_status_graph()
+            story_ids = graph.parents_of(task_id)
+            if not story_ids:
+                log_warning(f"No story found in backlog for task {task_id}")
                 return False
-                
-            updated_content = re.sub(pattern, replacement, backlog_content)
-            backlog_file.write_text(updated_content, encoding='utf-8')
-            log_info(f"Updated story {story_id} status to Done in backlog")
-            return True
+            
+            updated = False
+            for story_id in story_ids:
+                log_info(f"Checking story {story_id} completion status")
+                story = graph.nodes[story_id]
+                if story.done_children < len(story.children):
+                    log_info(f"Story {story_id} has incomplete tasks, skipping backlog update")
+                elif graph.rollup_story(story_id):
+                    log_info(f"Updated story {story_id} status to Done in backlog")
+                    updated = True
+                else:
+                    log_warning(f"Story {story_id} already marked as Done in backlog")
+            return updated
             
         except Exception as e:
             log_error(f"Failed to update backlog: {e}")
@@ -160,92 +625,61 @@ class DocumentationUpdater:
     def update_requirements_from_story(self, story_id: str) -> bool:
         """Update requirement status based on story completion."""
         try:
-            # Extract requirement ID from story (STORY-S1-1 -> REQ-S1-1)
-            req_id = story_id.replace("STORY-", "REQ-", 1)
-            log_info(f"Checking requirement {req_id} completion status")
-            
-            # Read backlog to check if all stories for this requirement are done
-            backlog_file = self.pages_dir / "backlog.md"
-            if not backlog_file.exists():
+            if self.get_document("backlog.md") is None:
                 log_error("Backlog file not found")
                 return False
-                
-            backlog_content = backlog_file.read_text(encoding='utf-8')
-            
-            # Find all stories for this requirement
-            req_stories = []
-            for line in backlog_content.split('\n'):
-                if req_id.replace("REQ-", "STORY-") in line:
-                    req_stories.append(line)
-            
-            if not req_stories:
-                log_warning(f"No stories found for requirement {req_id}")
-                return False
-            
-            # Check if all stories are done
-            all_done = True
-            done_count = 0
-            total_count = 0
-            
-            for story_line in req_stories:
-                total_count += 1
-                if "| Done |" in story_line:
-                    done_count += 1
-                elif "| In Progress |" in story_line or "| TODO |" in story_line:
-                    all_done = False
-            
-            # Determine new status
-            if all_done and done_count > 0:
-                new_status = "IMPLEMENTED"
-            elif done_count > 0:
-                new_status = "PARTIAL"
-            else:
-                log_info(f"No completed stories for requirement {req_id}, skipping update")
-                return False
-            
-            # Update requirements file
-            requirements_file = self.pages_dir / "requirements.md"
-            if not requirements_file.exists():
+            if self.get_document("requirements.md") is None:
                 log_error("Requirements file not found")
                 return False
-                
-            requirements_content = requirements_file.read_text(encoding='utf-8')
-            
-            # Update requirement status
-            pattern = rf'(\|\s*{re.escape(req_id)}\s*\|.*?\|\s*)(PLANNED|PARTIAL|IMPLEMENTED)(\s*\|)'
-            replacement = rf'\1{new_status}\3'
             
-            if not re.search(pattern, requirements_content):
-                log_warning(f"Requirement {req_id} not found or already has status {new_status}")
+            graph = self.get_status_graph()
+            req_ids = graph.parents_of(story_id)
+            if not req_ids:
+                log_warning(f"No requirement found for story {story_id}")
                 return False
-                
-            updated_content = re.sub(pattern, replacement, requirements_content)
-            requirements_file.write_text(updated_content, encoding='utf-8')
-            log_info(f"Updated requirement {req_id} status to {new_status}")
-            return True
+            
+            updated = False
+            for req_id in req_ids:
+                log_info(f"Checking requirement {req_id} completion status")
+                if graph.nodes[req_id].done_children == 0:
+                    log_info(f"No completed stories for requirement {req_id}, skipping update")
+                    continue
+                new_status = graph.rollup_requirement(req_id)
+                if new_status:
+                    log_info(f"Updated requirement {req_id} status to {new_status}")
+                    updated = True
+                else:
+                    log_warning(f"Requirement {req_id} already has status {graph.nodes[req_id].status}")
+            return updated
             
         except Exception as e:
             log_error(f"Failed to update requirements: {e}")
             return False
+
+    def recompute_all_statuses(self) -> int:
+        """Rebuild every story and requirement status from the task statuses in one pass."""
+        if not self.get_sprint_plans():
+            log_error(f"Sprint plan file not found: {self.pages_dir / 'sprint-plan.md'}")
+            return 0
+        graph = self.get_status_graph()
+        changes = graph.recompute_all()
+        for node_id, new_status in changes:
+            log_info(f"Updated {node_id} status to {new_status}")
+        log_info(f"Recomputed statuses of {len(graph.nodes)} items, {len(changes)} changed")
+        return len(changes)
     
     def check_backlog_requirements_integrity(self) -> bool:
         """Check that every Req. ID in backlog.md exists in requirements.md."""
         try:
-            backlog_file = self.pages_dir / "backlog.md"
-            requirements_file = self.pages_dir / "requirements.md"
+            backlog = self.get_document("backlog.md")
+            requirements = self.get_document("requirements.md")
             
-            if not backlog_file.exists() or not requirements_file.exists():
+            if backlog is None or requirements is None:
                 log_warning("Required files for integrity check not found")
                 return True  # Don't fail on missing files
             
-            backlog_content = backlog_file.read_text(encoding='utf-8')
-            requirements_content = requirements_file.read_text(encoding='utf-8')
-            
-            # Extract requirement IDs from both files
-            backlog_reqs = set(re.findall(r'REQ-[A-Z]+-\d+', backlog_content))
-            requirements_reqs = set(re.findall(r'REQ-[A-Z]+-\d+', requirements_content))
-            
-            missing_reqs = backlog_reqs - requirements_reqs
+            # Compare requirement IDs from both indexes
+            missing_reqs = backlog.index.requirement_ids - requirements.index.requirement_ids
             if missing_reqs:
                 self.errors.append(f"Missing requirements in requirements.md: {missing_reqs}")
                 return False
@@ -260,21 +694,15 @@ class DocumentationUpdater:
     def check_roadmap_backlog_integrity(self) -> bool:
         """Check that every Epic ID in roadmap.md exists in backlog.md."""
         try:
-            roadmap_file = self.pages_dir / "roadmap.md"
-            backlog_file = self.pages_dir / "backlog.md"
+            roadmap = self.get_document("roadmap.md")
+            backlog = self.get_document("backlog.md")
             
-            if not roadmap_file.exists() or not backlog_file.exists():
+            if roadmap is None or backlog is None:
                 log_warning("Required files for roadmap-backlog integrity check not found")
                 return True  # Don't fail on missing files
             
-            roadmap_content = roadmap_file.read_text(encoding='utf-8')
-            backlog_content = backlog_file.read_text(encoding='utf-8')
-            
-            # Extract epic IDs from both files
-            roadmap_epics = set(re.findall(r'EPIC-[A-Z]+', roadmap_content))
-            backlog_epics = set(re.findall(r'EPIC-[A-Z]+', backlog_content))
-            
-            missing_epics = roadmap_epics - backlog_epics
+            # Compare epic IDs from both indexes
+            missing_epics = roadmap.index.epic_ids - backlog.index.epic_ids
             if missing_epics:
                 self.errors.append(f"Missing epics in backlog.md: {missing_epics}")
                 return False
@@ -287,23 +715,18 @@ class DocumentationUpdater:
             return False
     
     def check_sprint_backlog_integrity(self) -> bool:
-        """Check that every Story ID in sprint-plan.md exists in backlog.md."""
+        """Check that every Story ID in all sprint plan shards exists in backlog.md."""
         try:
-            sprint_file = self.pages_dir / "sprint-plan.md"
-            backlog_file = self.pages_dir / "backlog.md"
+            sprint_plans = self.get_sprint_plans()
+            backlog = self.get_document("backlog.md")
             
-            if not sprint_file.exists() or not backlog_file.exists():
+            if not sprint_plans or backlog is None:
                 log_warning("Required files for sprint-backlog integrity check not found")
                 return True  # Don't fail on missing files
             
-            sprint_content = sprint_file.read_text(encoding='utf-8')
-            backlog_content = backlog_file.read_text(encoding='utf-8')
-            
-            # Extract story IDs from both files
-            sprint_stories = set(re.findall(r'STORY-[A-Z]+-\d+', sprint_content))
-            backlog_stories = set(re.findall(r'STORY-[A-Z]+-\d+', backlog_content))
-            
-            missing_stories = sprint_stories - backlog_stories
+            # Compare story IDs from both indexes
+            sprint_stories = set().union(*(sprint_plan.index.story_ids for sprint_plan in sprint_plans))
+            missing_stories = sprint_stories - backlog.index.story_ids
             if missing_stories:
                 self.errors.append(f"Missing stories in backlog.md: {missing_stories}")
                 return False
@@ -318,37 +741,26 @@ class DocumentationUpdater:
     def check_status_consistency(self) -> None:
         """Check status consistency between requirements and stories."""
         try:
-            requirements_file = self.pages_dir / "requirements.md"
-            backlog_file = self.pages_dir / "backlog.md"
+            requirements = self.get_document("requirements.md")
+            backlog = self.get_document("backlog.md")
             
-            if not requirements_file.exists() or not backlog_file.exists():
+            if requirements is None or backlog is None:
                 log_warning("Required files for status consistency check not found")
                 return
             
-            requirements_content = requirements_file.read_text(encoding='utf-8')
-            backlog_content = backlog_file.read_text(encoding='utf-8')
-            
             # Find implemented requirements
-            implemented_reqs = []
-            for line in requirements_content.split('\n'):
-                if "| IMPLEMENTED |" in line:
-                    req_match = re.search(r'REQ-[A-Z]+-\d+', line)
-                    if req_match:
-                        implemented_reqs.append(req_match.group(0))
+            implemented_reqs = sorted(
+                req_id for req_id, status in requirements.index.statuses.items()
+                if req_id.startswith("REQ-") and status == "IMPLEMENTED"
+            )
             
-            # Check if all stories for implemented requirements are done
+            # Check if all stories linked to implemented requirements are done
+            graph = self.get_status_graph()
             for req_id in implemented_reqs:
-                req_stories = []
-                for line in backlog_content.split('\n'):
-                    if req_id.replace("REQ-", "STORY-") in line:
-                        req_stories.append(line)
-                
-                incomplete_stories = []
-                for story_line in req_stories:
-                    if "| Done |" not in story_line and ("| In Progress |" in story_line or "| TODO |" in story_line):
-                        story_match = re.search(r'STORY-[A-Z]+-\d+', story_line)
-                        if story_match:
-                            incomplete_stories.append(story_match.group(0))
+                incomplete_stories = [
+                    story_id for story_id in graph.children_of(req_id)
+                    if backlog.index.statuses.get(story_id) in ("In Progress", "TODO")
+                ]
                 
                 if incomplete_stories:
                     self.warnings.append(f"Requirement {req_id} is IMPLEMENTED but has incomplete stories: {incomplete_stories}")
@@ -394,19 +806,8 @@ class DocumentationUpdater:
         return checks_passed
 
 
-def main():
-    """Main entry point with argument parsing and execution logic."""
-    import argparse
-    
-    parser = argparse.ArgumentParser(
-        description="Update documentation status across sprint plans, backlogs, and requirements",
-        epilog="Examples:\n"
-               "  %(prog)s --commit-message \"Closes TASK-S1-1\"\n"
-               "  %(prog)s --task-id TASK-S1-1\n"
-               "  %(prog)s --check-only",
-        formatter_class=argparse.RawDescriptionHelpFormatter
-    )
-    
+def add_step_arguments(parser) -> None:
+    """Options shared by main() and the update-status step of kb.py."""
     parser.add_argument(
         "--commit-message", 
         help="Git commit message containing task closure information"
@@ -415,6 +816,20 @@ def main():
         "--task-id", 
         help="Direct task ID to update (e.g., TASK-S1-1)"
     )
+    parser.add_argument(
+        "--commit-range",
+        help="Git revision range (e.g., A..B) whose commit messages are processed in one batch"
+    )
+    parser.add_argument(
+        "--stdin",
+        action="store_true",
+        help="Read commit messages from standard input and process them in one batch"
+    )
+    parser.add_argument(
+        "--recompute-all",
+        action="store_true",
+        help="Rebuild every story and requirement status from task statuses in one pass"
+    )
     parser.add_argument(
         "--check-only", 
         action="store_true", 
@@ -425,54 +840,69 @@ def main():
         default="pages", 
         help="Directory containing documentation files (default: pages)"
     )
-    
-    args = parser.parse_args()
-    
+
+
+def run_step(args: argparse.Namespace, documents: Optional[DocumentCache] = None) -> int:
+    """Run the status update for parsed arguments and return the exit code."""
     # Initialize updater
-    updater = DocumentationUpdater(pages_dir=args.pages_dir)
+    updater = DocumentationUpdater(pages_dir=args.pages_dir, cache=documents)
     
     # Handle check-only mode
     if args.check_only:
         log_info("Running in check-only mode")
         success = updater.run_consistency_checks()
-        sys.exit(0 if success else 1)
+        return 0 if success else 1
     
-    # Determine task ID from commit message or direct input
-    task_id = None
-    if args.commit_message:
+    # Determine which tasks to process
+    task_ids: List[str] = []
+    if args.recompute_all:
+        log_info("Recomputing all statuses")
+    # Batch mode: process every task closed in a commit range or on stdin
+    elif args.commit_range or args.stdin:
+        if args.commit_range:
+            try:
+                result = subprocess.run(
+                    ["git", "log", "--reverse", "--format=%B", args.commit_range],
+                    capture_output=True, text=True, check=True
+                )
+            except subprocess.CalledProcessError as e:
+                log_error(f"Failed to read commit range {args.commit_range}: {e.stderr.strip()}")
+                return 1
+            except FileNotFoundError as e:
+                log_error(f"Failed to read commit range {args.commit_range}: {e}")
+                return 1
+            messages = result.stdout
+        else:
+            messages = sys.stdin.read()
+        task_ids = updater.extract_task_ids_from_text(messages)
+    elif args.commit_message:
+        # Determine task ID from commit message or direct input
         task_id = updater.extract_task_id_from_commit(args.commit_message)
         if not task_id:
             log_error("No task ID found in commit message")
-            sys.exit(1)
+            return 1
+        task_ids = [task_id]
     elif args.task_id:
-        task_id = args.task_id
+        task_ids = [args.task_id]
     else:
-        log_error("Either --commit-message or --task-id must be provided")
-        sys.exit(1)
-    
-    log_info(f"Processing task: {task_id}")
-    
-    # Execute update protocol
-    success = True
-    
-    # Step 1: Update sprint plan
-    sprint_success = updater.update_sprint_plan(task_id)
-    if not sprint_success:
-        success = False
-    
-    # Step 2: Update backlog from task
-    if success:
-        backlog_success = updater.update_backlog_from_task(task_id)
-        if not backlog_success:
-            log_warning("Backlog update failed, continuing with consistency checks")
-    
-    # Step 3: Update requirements from story
-    if success:
-        # Extract story ID from task and update requirements
-        story_id = task_id.replace("TASK-", "STORY-", 1)
-        req_success = updater.update_requirements_from_story(story_id)
-        if not req_success:
-            log_warning("Requirements update failed, continuing with consistency checks")
+        log_error("Either --commit-message, --task-id, --commit-range or --stdin must be provided")
+        return 1
+
+    batch = bool(args.commit_range or args.stdin)
+
+    def apply_updates() -> Tuple[DocumentationUpdater, bool]:
+        attempt_updater = DocumentationUpdater(pages_dir=args.pages_dir, cache=documents)
+        return attempt_updater, attempt_updater.run_updates(task_ids, args.recompute_all, batch)
+
+    def report_retry(attempt: int, error: Exception) -> None:
+        log_warning(f"{error}; re-reading documents and retrying (attempt {attempt + 1})")
+
+    # Re-run the whole read-modify-write cycle if another process changed the documents
+    try:
+        updater, success = retry_on_contention(apply_updates, on_retry=report_retry)
+    except (DocumentConflictError, DocumentLockTimeout) as e:
+        log_error(f"Could not write documentation updates: {e}")
+        return 1
     
     # Run consistency checks
     consistency_success = updater.run_consistency_checks()
@@ -482,10 +912,27 @@ def main():
     # Final result
     if success:
         log_info("Documentation update completed successfully")
-        sys.exit(0)
+        return 0
     else:
         log_error("Documentation update completed with errors")
-        sys.exit(1)
+        return 1
+
+
+def main():
+    """Main entry point with argument parsing and execution logic."""
+    parser = argparse.ArgumentParser(
+        description="Update documentation status across sprint plans, backlogs, and requirements",
+        epilog="Examples:\n"
+               "  %(prog)s --commit-message \"Closes TASK-S1-1\"\n"
+               "  %(prog)s --task-id TASK-S1-1\n"
+               "  %(prog)s --commit-range ORIG_HEAD..HEAD\n"
+               "  git log --format=%%B A..B | %(prog)s --stdin\n"
+               "  %(prog)s --recompute-all\n"
+               "  %(prog)s --check-only",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    add_step_arguments(parser)
+    sys.exit(run_step(parser.parse_args()))
 
 
 if __name__ == "__main__":
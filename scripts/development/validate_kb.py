@@ -37,10 +37,12 @@ import sys
 import os
 import logging
 from pathlib import Path
-from typing import List, Set
+from typing import List, Optional, Set
 from datetime import datetime
 import argparse
 
+from kb_io import DocumentCache
+
 # --- Конфигурация ---
 
 # Директории, которые являются частью базы знаний и подлежат сканированию.
@@ -91,14 +93,17 @@ IGNORED_LINKS = {
 class KBValidator:
     """Валидатор Базы Знаний, реализующий все проверки."""
 
-    def __init__(self, base_path: Path):
+    def __init__(self, base_path: Path, documents: Optional[DocumentCache] = None):
         self.base_path = base_path.resolve()
+        # Общий кэш прочитанных документов: каждый файл читается один раз на все проверки
+        self.documents = documents or DocumentCache()
         self.errors: List[str] = []
         self.warnings: List[str] = []
         self.terminal_errors: List[str] = []
         self.external_errors: List[str] = []
         self.filtered_links: List[str] = []  # Новый список для отфильтрованных ссылок
-        self.valid_agent_roles = self._extract_valid_agent_roles()  # Извлекаем допустимые роли агентов
+        self._valid_agent_roles: Optional[List[str]] = None  # Читаются при первой проверке assignee
+        self._logger: Optional[logging.Logger] = None  # Лог-файл создается при первой записи
         # Регулярное выражение для поиска всех ссылок [[...]]
         self.link_pattern = re.compile(r"\[\[([^\]]+)\]\]")
         # Регулярные выражения для проверки имен файлов
@@ -110,8 +115,20 @@ class KBValidator:
         self.alias_link_pattern = re.compile(r"\[\[([^\]|]+)\|`([^`]+)`\]\]")
         # Загружаем паттерны из .gitignore
         self.gitignore_patterns = self._load_gitignore()
-        # Настраиваем логирование
-        self._setup_logging()
+
+    @property
+    def logger(self) -> logging.Logger:
+        """Логгер валидации; настраивается при первом обращении."""
+        if self._logger is None:
+            self._setup_logging()
+        return self._logger
+
+    @property
+    def valid_agent_roles(self) -> List[str]:
+        """Допустимые роли агентов; извлекаются из документа возможностей при первом обращении."""
+        if self._valid_agent_roles is None:
+            self._valid_agent_roles = self._extract_valid_agent_roles()
+        return self._valid_agent_roles
 
     def _setup_logging(self):
         """Настраивает логирование в файл."""
@@ -122,8 +139,12 @@ class KBValidator:
         log_file = log_dir / f"validate_kb_{timestamp}.log"
         
         # Create separate loggers for file and console
-        self.logger = logging.getLogger(__name__)
-        self.logger.setLevel(logging.INFO)
+        self._logger = logging.getLogger(__name__)
+        self._logger.setLevel(logging.INFO)
+        # Drop handlers of a previous validator run in the same process (kb.py)
+        for handler in list(self._logger.handlers):
+            self._logger.removeHandler(handler)
+            handler.close()
         
         # File handler - logs everything
         file_handler = logging.FileHandler(log_file, encoding='utf-8')
@@ -137,10 +158,10 @@ class KBValidator:
         console_formatter = logging.Formatter('%(levelname)s - %(message)s')
         console_handler.setFormatter(console_formatter)
         
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        self._logger.addHandler(file_handler)
+        self._logger.addHandler(console_handler)
         
-        self.logger.info(f"Validation started. Log file: {log_file}")
+        self._logger.info(f"Validation started. Log file: {log_file}")
 
     def _is_knowledge_base_file(self, file_path: Path) -> bool:
         """Проверяет, находится ли файл в директориях базы знаний."""
@@ -236,7 +257,7 @@ class KBValidator:
             return valid_roles
         
         try:
-            content = agent_capabilities_path.read_text(encoding="utf-8")
+            content = self.documents.read_text(agent_capabilities_path)
             # Ищем заголовки агентов в формате #### Иконка ИмяАгента
             agent_header_pattern = re.compile(r"^####\s+[^\s]+\s+(.+)$", re.MULTILINE)
             matches = agent_header_pattern.findall(content)
@@ -287,7 +308,7 @@ class KBValidator:
     def validate_link_integrity(self, md_file: Path, all_pages: Set[str]):
         """Проверяет все ссылки в одном файле на существование."""
         try:
-            content = md_file.read_text(encoding="utf-8")
+            content = self.documents.read_text(md_file)
             # Удаляем блоки кода перед извлечением ссылок
             content_without_code = self._remove_code_blocks(content)
             found_links = self.link_pattern.findall(content_without_code)
@@ -317,7 +338,7 @@ class KBValidator:
     def validate_correct_link_formatting(self, md_file: Path):
         """Проверяет, что ссылки на внешние файлы следуют правильному формату алиасов."""
         try:
-            content = md_file.read_text(encoding="utf-8")
+            content = self.documents.read_text(md_file)
             # Удаляем блоки кода перед извлечением ссылок
             content_without_code = self._remove_code_blocks(content)
             # Находим все ссылки с алиасами
@@ -391,7 +412,7 @@ class KBValidator:
             if not relative_path.startswith("pages/"):
                 return
             
-            content = md_file.read_text(encoding="utf-8")
+            content = self.documents.read_text(md_file)
             
             # Проверка User Stories
             if filename.startswith("STORY-"):
@@ -460,7 +481,7 @@ class KBValidator:
             if not relative_path.startswith("pages/"):
                 return
             
-            content = md_file.read_text(encoding="utf-8")
+            content = self.documents.read_text(md_file)
             
             # Проверка User Stories
             if filename.startswith("STORY-"):
@@ -523,7 +544,7 @@ class KBValidator:
             if not relative_path.startswith("pages/"):
                 return
             
-            content = md_file.read_text(encoding="utf-8")
+            content = self.documents.read_text(md_file)
             
             # Проверка User Stories
             if filename.startswith("STORY-"):
@@ -558,7 +579,7 @@ class KBValidator:
             
             # Проверяем только файлы с именем README.md
             if filename == "README.md":
-                content = md_file.read_text(encoding="utf-8")
+                content = self.documents.read_text(md_file)
                 
                 # Проверяем наличие свойства title::
                 if "title::" not in content:
@@ -629,6 +650,7 @@ class KBValidator:
     def run_validation(self):
         """Запускает все проверки для базы знаний."""
         print(f"Корень проекта: {self.base_path}")
+        self.logger.info(f"Project root: {self.base_path}")
         all_md_files = self._find_markdown_files()
         
         if not all_md_files:
@@ -723,6 +745,14 @@ class KBValidator:
         print("\n-------------------------")
 
 
+def run_step(args: argparse.Namespace, documents: Optional[DocumentCache] = None) -> int:
+    """Запускает валидацию как шаг kb.py. Возвращает код выхода."""
+    validator = KBValidator(args.project_root, documents)
+    validator.run_validation()
+    validator.print_report()
+    return 1 if validator.errors else 0
+
+
 def main():
     parser = argparse.ArgumentParser(description='Скрипт для Валидации Базы Знаний Logseq.')
     parser.add_argument(
@@ -732,15 +762,7 @@ def main():
         help='Корневая директория проекта для валидации.'
     )
     args = parser.parse_args()
-
-    validator = KBValidator(args.project_root)
-    validator.run_validation()
-    validator.print_report()
-
-    if validator.errors:
-        sys.exit(1)
-    else:
-        sys.exit(0)
+    sys.exit(run_step(args))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()